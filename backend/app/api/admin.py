@@ -3,7 +3,7 @@ import os
 import uuid
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Response, UploadFile, status
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -15,26 +15,50 @@ from app.models.document import Document, ContentType
 from app.schemas.auth import PracticeAreaResponse, UserResponse
 from app.schemas.user import UserCreateRequest, UserUpdateRequest, UserPracticeAreaUpdateRequest
 from app.schemas.document import DocumentUploadRequest, DocumentResponse
+from app.services.admission import admission_controller
 from app.services.ingestion import ingestion_service
+from app.services.reconciliation import reconciliation_service
+from app.utils.pagination import next_keyset_cursor, seek_newest_first
 
 router = APIRouter()
 
 
+def _set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the next page's cursor on list endpoints whose body is a bare list."""
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+
 # ============== User Management ==============
 
 @router.get("/users", response_model=List[UserResponse])
 async def list_users(
-    skip: int = 0,
-    limit: int = 50,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     admin_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """List all users (admin only)."""
-    result = await db.execute(
-        select(User).offset(skip).limit(limit)
-    )
+    """List all users, newest first (admin only).
+    
+    The X-Next-Cursor response header is the `cursor` for the next page.
+    `skip` still works without a cursor but gets slower on deep pages.
+    """
+    try:
+        query = seek_newest_first(select(User), User.created_at, User.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    if not cursor:
+        query = query.offset(skip)
+    
+    result = await db.execute(query)
     users = list(result.scalars().all())
-    return [UserResponse.model_validate(user) for user in users]
+    _set_next_cursor(response, next_keyset_cursor(users, limit, "created_at"))
+    return [UserResponse.model_validate(user) for user in users[:limit]]
 
 
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -209,39 +233,40 @@ async def list_all_practice_areas(
 
 @router.get("/documents", response_model=List[DocumentResponse])
 async def list_all_documents(
-    skip: int = 0,
-    limit: int = 50,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     practice_area_id: Optional[int] = None,
     admin_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """List all documents (admin only)."""
+    """List all documents, newest first (admin only).
+    
+    Paged like list_users: follow X-Next-Cursor rather than `skip`.
+    """
     query = select(Document)
     
     if practice_area_id:
         query = query.where(Document.practice_area_id == practice_area_id)
     
-    query = query.order_by(Document.created_at.desc()).offset(skip).limit(limit)
+    try:
+        query = seek_newest_first(query, Document.created_at, Document.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    if not cursor:
+        query = query.offset(skip)
     
     result = await db.execute(query)
     documents = list(result.scalars().all())
+    _set_next_cursor(response, next_keyset_cursor(documents, limit, "created_at"))
     
     return [
-        DocumentResponse(
-            id=doc.id,
-            title=doc.title,
-            description=doc.description,
-            content_type=doc.content_type,
-            practice_area_id=doc.practice_area_id,
-            file_name=doc.file_name,
-            file_size_bytes=doc.file_size_bytes,
-            source_url=doc.source_url,
-            author=doc.author,
-            published_at=doc.published_at,
-            created_at=doc.created_at,
-            chunk_count=0,
-        )
-        for doc in documents
+        DocumentResponse.model_validate(doc)
+        for doc in documents[:limit]
     ]
 
 
@@ -265,25 +290,7 @@ async def upload_text_document(
             metadata=request.metadata,
         )
         
-        # Count chunks
-        chunk_count = await db.execute(
-            select(func.count()).select_from(Document).where(Document.id == document.id)
-        )
-        
-        return DocumentResponse(
-            id=document.id,
-            title=document.title,
-            description=document.description,
-            content_type=document.content_type,
-            practice_area_id=document.practice_area_id,
-            file_name=document.file_name,
-            file_size_bytes=document.file_size_bytes,
-            source_url=document.source_url,
-            author=document.author,
-            published_at=document.published_at,
-            created_at=document.created_at,
-            chunk_count=0,
-        )
+        return DocumentResponse.model_validate(document)
     
     except ValueError as e:
         raise HTTPException(
@@ -320,9 +327,10 @@ async def upload_file_document(
     
     os.makedirs(settings.UPLOAD_DIRECTORY, exist_ok=True)
     
+    # Copy in blocks so large uploads never sit in memory whole
     with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+        while block := await file.read(1024 * 1024):
+            f.write(block)
     
     try:
         document = await ingestion_service.ingest_document(
@@ -335,20 +343,7 @@ async def upload_file_document(
             author=author,
         )
         
-        return DocumentResponse(
-            id=document.id,
-            title=document.title,
-            description=document.description,
-            content_type=document.content_type,
-            practice_area_id=document.practice_area_id,
-            file_name=document.file_name,
-            file_size_bytes=document.file_size_bytes,
-            source_url=document.source_url,
-            author=document.author,
-            published_at=document.published_at,
-            created_at=document.created_at,
-            chunk_count=0,
-        )
+        return DocumentResponse.model_validate(document)
     
     except Exception as e:
         # Clean up file on error
@@ -378,6 +373,41 @@ async def delete_document(
     return {"message": "Document deleted"}
 
 
+@router.post("/reconcile", status_code=status.HTTP_202_ACCEPTED)
+async def reconcile_vector_store(
+    repair: bool = False,
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """Start a background check (and optional repair) of drift between document chunks and the vector store (admin only).
+
+    Returns the job status; poll GET /reconcile/{job_id} for the report.
+    """
+    return reconciliation_service.start_job(repair=repair)
+
+
+@router.get("/reconcile/{job_id}")
+async def get_reconcile_job(
+    job_id: str,
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """Status and report of a reconciliation job (admin only)."""
+    job = reconciliation_service.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reconciliation job not found",
+        )
+    return job
+
+
+@router.get("/llm-admission")
+async def get_llm_admission_metrics(
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """LLM admission queue depth, counters and wait-time percentiles (admin only)."""
+    return admission_controller.metrics()
+
+
 # ============== Stats ==============
 
 @router.get("/stats")
@@ -1,13 +1,18 @@
 """Chat API endpoints."""
-from typing import List
+import asyncio
+import json
+import math
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.rate_limit import rate_limited, rate_limiter
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.conversation import Conversation, Message
@@ -20,48 +25,96 @@ from app.schemas.chat import (
     MessageResponse,
     SourceCitation,
 )
+from app.services.admission import AdmissionRejected
+from app.services.context_packer import context_packer
 from app.services.rag import rag_service
+from app.utils.pagination import next_keyset_cursor, seek_newest_first
+from app.utils.sse import coalesce_deltas, format_sse
 
 router = APIRouter()
 
+# Messages fetched per round trip by the conversation export
+EXPORT_BATCH_ROWS = 200
+
+
+async def _prepare_turn(request: ChatMessageRequest, user: User, db: AsyncSession) -> Dict[str, Any]:
+    """Run the pre-generation pipeline, mapping its failures to HTTP errors."""
+    try:
+        return await rag_service.prepare_turn(
+            query=request.message,
+            user=user,
+            db=db,
+            conversation_id=request.conversation_id,
+            mode=request.mode,
+        )
+    except LookupError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found",
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Timed out preparing the response",
+        )
+
+
+def _source_citation(src: Dict[str, Any]) -> SourceCitation:
+    return SourceCitation(
+        document_id=src.get("document_id"),
+        title=src["title"],
+        practice_area=src["practice_area"],
+        content_type=src["content_type"],
+        content_preview=src["content"][:500],
+        similarity=src["similarity"],
+    )
+
+
+async def _get_user_conversation(db: AsyncSession, conversation_id: UUID, user: User) -> Conversation:
+    """Load one of the user's conversations or raise 404."""
+    result = await db.execute(
+        select(Conversation)
+        .where(Conversation.id == conversation_id)
+        .where(Conversation.user_id == user.id)
+    )
+    conversation = result.scalar_one_or_none()
+    
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found",
+        )
+    return conversation
+
+
+def _message_response(msg: Message) -> MessageResponse:
+    return MessageResponse(
+        id=msg.id,
+        role=msg.role.value,
+        content=msg.content,
+        citations=msg.citations or [],
+        created_at=msg.created_at,
+    )
+
 
 @router.post("/message", response_model=ChatMessageResponse)
 async def send_message(
     request: ChatMessageRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(rate_limited("chat", uses_llm=True)),
     db: AsyncSession = Depends(get_db),
 ):
     """Send a message and get an AI response."""
-    conversation = None
-    
-    # Get or create conversation
-    if request.conversation_id:
-        result = await db.execute(
-            select(Conversation)
-            .where(Conversation.id == request.conversation_id)
-            .where(Conversation.user_id == current_user.id)
-        )
-        conversation = result.scalar_one_or_none()
-        
-        if not conversation:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found",
-            )
-    else:
-        # Create new conversation
-        conversation = await rag_service.create_conversation(
-            db=db,
-            user_id=current_user.id,
-            title=request.message[:50] + "..." if len(request.message) > 50 else request.message,
-        )
+    turn = await _prepare_turn(request, current_user, db)
+    conversation = turn["conversation"]
     
     # Generate response
     result = await rag_service.generate_response(
         query=request.message,
-        user=current_user,
-        conversation=conversation,
-        db=db,
+        turn=turn,
+    )
+    await rate_limiter.record_tokens(
+        current_user,
+        result["usage"]["input_tokens"] + result["usage"]["output_tokens"],
     )
     
     # Save conversation turn
@@ -71,21 +124,11 @@ async def send_message(
         user_message=request.message,
         assistant_response=result["response"],
         citations=result["citations"],
-        metadata=result["usage"],
+        metadata=result["metadata"],
     )
     
     # Format sources
-    sources = [
-        SourceCitation(
-            document_id=src.get("document_id"),
-            title=src["title"],
-            practice_area=src["practice_area"],
-            content_type=src["content_type"],
-            content_preview=src["content"][:500],
-            similarity=src["similarity"],
-        )
-        for src in result["sources"]
-    ]
+    sources = [_source_citation(src) for src in result["sources"]]
     
     return ChatMessageResponse(
         response=result["response"],
@@ -98,28 +141,56 @@ async def send_message(
 @router.post("/message/stream")
 async def send_message_stream(
     request: ChatMessageRequest,
-    current_user: User = Depends(get_current_user),
+    http_request: Request,
+    current_user: User = Depends(rate_limited("chat", uses_llm=True)),
     db: AsyncSession = Depends(get_db),
 ):
     """Send a message and get a streaming AI response."""
-    conversation = None
-    
-    if request.conversation_id:
-        result = await db.execute(
-            select(Conversation)
-            .where(Conversation.id == request.conversation_id)
-            .where(Conversation.user_id == current_user.id)
-        )
-        conversation = result.scalar_one_or_none()
+    # Prepared before the response starts so errors still map to status codes
+    turn = await _prepare_turn(request, current_user, db)
+    contexts = turn["cached"]["sources"] if turn["cached"] else turn["contexts"]
     
     async def generate():
-        async for chunk in rag_service.generate_response_stream(
-            query=request.message,
-            user=current_user,
-            conversation=conversation,
-        ):
-            yield f"data: {chunk}\n\n"
-        yield "data: [DONE]\n\n"
+        # Sources go out before the first token so citations render immediately
+        yield format_sse("sources", {
+            "conversation_id": str(turn["conversation"].id),
+            "sources": [_source_citation(src).model_dump() for src in contexts],
+        })
+        
+        events = coalesce_deltas(
+            rag_service.generate_response_stream(query=request.message, turn=turn),
+            max_delay_ms=settings.STREAM_COALESCE_MS,
+            max_chars=settings.STREAM_COALESCE_CHARS,
+        )
+        streamed: List[str] = []
+        input_tokens = 0
+        usage = None
+        try:
+            async for event in events:
+                if event["type"] == "delta":
+                    # Stop pulling tokens as soon as the client has gone away
+                    if await http_request.is_disconnected():
+                        return
+                    streamed.append(event["text"])
+                    yield format_sse("delta", {"text": event["text"]})
+                elif event["type"] == "input_usage":
+                    input_tokens = event["usage"]["input_tokens"]
+                elif event["type"] == "usage":
+                    usage = event["usage"]
+                    yield format_sse("usage", usage)
+            yield format_sse("done", {})
+        except AdmissionRejected as exc:
+            # Headers are already sent, so shedding is reported in-band
+            yield format_sse("error", {"detail": exc.reason, "retry_after": math.ceil(exc.retry_after)})
+        finally:
+            if usage is not None:
+                tokens = usage["input_tokens"] + usage["output_tokens"]
+            else:
+                # Ended early: input is known from message_start, output is estimated
+                tokens = input_tokens + context_packer.count_tokens("".join(streamed))
+            await rate_limiter.record_tokens(current_user, tokens)
+            # Closing the chain aborts the upstream generation if it is still running
+            await events.aclose()
     
     return StreamingResponse(
         generate(),
@@ -129,16 +200,28 @@ async def send_message_stream(
 
 @router.get("/conversations", response_model=ConversationListResponse)
 async def list_conversations(
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """List user's conversations."""
-    conversations = await rag_service.get_user_conversations(
-        db=db,
-        user_id=current_user.id,
-        limit=limit,
-    )
+    """List user's conversations, most recently updated first; pass next_cursor for the next page.
+    
+    A conversation that gets a new message while paging moves to the front,
+    so that pass can miss it; it appears first on a refresh.
+    """
+    try:
+        conversations, next_cursor = await rag_service.get_user_conversations(
+            db=db,
+            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
     
     return ConversationListResponse(
         conversations=[
@@ -150,36 +233,41 @@ async def list_conversations(
                 messages=[],
             )
             for conv in conversations
-        ]
+        ],
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/conversations/{conversation_id}", response_model=ConversationResponse)
 async def get_conversation(
     conversation_id: UUID,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get a specific conversation with messages."""
-    result = await db.execute(
-        select(Conversation)
-        .where(Conversation.id == conversation_id)
-        .where(Conversation.user_id == current_user.id)
-    )
-    conversation = result.scalar_one_or_none()
+    """Get a conversation with a page of its messages.
     
-    if not conversation:
+    Pages walk back from the newest message; pass next_cursor to load older
+    ones. Messages within a page are in chronological order, ready to be
+    prepended to the thread.
+    """
+    conversation = await _get_user_conversation(db, conversation_id, current_user)
+    
+    try:
+        query = seek_newest_first(
+            select(Message).where(Message.conversation_id == conversation_id),
+            Message.created_at,
+            Message.id,
+            cursor,
+            limit,
+        )
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
         )
-    
-    # Load messages
-    msg_result = await db.execute(
-        select(Message)
-        .where(Message.conversation_id == conversation_id)
-        .order_by(Message.created_at)
-    )
+    msg_result = await db.execute(query)
     messages = list(msg_result.scalars().all())
     
     return ConversationResponse(
@@ -187,16 +275,49 @@ async def get_conversation(
         title=conversation.title,
         created_at=conversation.created_at,
         updated_at=conversation.updated_at,
-        messages=[
-            MessageResponse(
-                id=msg.id,
-                role=msg.role.value,
-                content=msg.content,
-                citations=msg.citations or [],
-                created_at=msg.created_at,
+        messages=[_message_response(msg) for msg in reversed(messages[:limit])],
+        next_cursor=next_keyset_cursor(messages, limit, "created_at"),
+    )
+
+
+@router.get("/conversations/{conversation_id}/export")
+async def export_conversation(
+    conversation_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Export a whole conversation as NDJSON, streamed in chronological order.
+    
+    The first line describes the conversation; each further line is one
+    message. Rows are read through a server-side cursor, so memory stays
+    bounded however long the thread is.
+    """
+    conversation = await _get_user_conversation(db, conversation_id, current_user)
+    header = {
+        "type": "conversation",
+        "id": str(conversation.id),
+        "title": conversation.title,
+        "created_at": conversation.created_at.isoformat(),
+        "updated_at": conversation.updated_at.isoformat(),
+    }
+    
+    async def lines():
+        yield json.dumps(header) + "\n"
+        # The request's session is closed once the response starts, so stream from our own
+        async with AsyncSessionLocal() as session:
+            result = await session.stream_scalars(
+                select(Message)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at, Message.id)
+                .execution_options(yield_per=EXPORT_BATCH_ROWS)
             )
-            for msg in messages
-        ],
+            async for msg in result:
+                yield json.dumps({"type": "message", **_message_response(msg).model_dump(mode="json")}) + "\n"
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="conversation-{conversation_id}.ndjson"'},
     )
 
 
@@ -229,18 +350,7 @@ async def delete_conversation(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a conversation."""
-    result = await db.execute(
-        select(Conversation)
-        .where(Conversation.id == conversation_id)
-        .where(Conversation.user_id == current_user.id)
-    )
-    conversation = result.scalar_one_or_none()
-    
-    if not conversation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found",
-        )
+    conversation = await _get_user_conversation(db, conversation_id, current_user)
     
     await db.delete(conversation)
     await db.commit()
@@ -1,84 +1,273 @@
 """Search API endpoints."""
-from typing import List, Optional
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
 
-from fastapi import APIRouter, Depends, Query
+import numpy as np
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.rate_limit import rate_limited, rate_limiter
 from app.core.security import get_current_user
 from app.models.user import User, PracticeArea
 from app.models.document import Document, ContentType
 from app.schemas.document import (
+    BatchSearchQuery,
+    BatchSearchRequest,
+    BatchSearchResponse,
+    SearchFacets,
     SearchRequest,
     SearchResponse,
     SearchResult,
+    Suggestion,
+    SuggestResponse,
+    DocumentSearchResult,
     DocumentResponse,
     DocumentListResponse,
 )
 from app.schemas.auth import PracticeAreaResponse
-from app.services.embeddings import embedding_service
-from app.services.vector_store import vector_store
+from app.services.filters import MetadataFilters
+from app.services.search import search_service
+from app.services.suggest import suggest_index
+from app.utils.pagination import decode_cursor, encode_cursor, next_keyset_cursor, seek_newest_first
+from app.utils.ranking import group_top_hits
 
 router = APIRouter()
 
+# Document list totals stop counting here
+DOCUMENT_COUNT_CAP = 10000
+
 
 @router.post("/", response_model=SearchResponse)
 async def search(
     request: SearchRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(rate_limited("search")),
     db: AsyncSession = Depends(get_db),
 ):
     """Semantic search across documents."""
-    # Get user's practice areas if not specified
-    practice_area_ids = request.practice_area_ids
-    if not practice_area_ids:
-        practice_area_ids = [pa.id for pa in current_user.practice_areas]
-    
-    # If user has no practice areas and none specified, search all (for admins)
-    if not practice_area_ids and not current_user.is_admin:
+    practice_area_ids = _practice_area_ids(request.practice_area_ids, current_user)
+    if practice_area_ids is None:
         return SearchResponse(
             results=[],
             query=request.query,
             total_results=0,
         )
     
-    # Generate query embedding
-    query_embedding = await embedding_service.generate_embedding(request.query)
+    offset = 0
+    cursor = None
+    if request.cursor:
+        try:
+            cursor = decode_cursor(request.cursor)
+            offset = int(cursor["offset"])
+            if offset < 0:
+                raise ValueError("Negative offset")
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
     
-    # Search vector store
-    results = await vector_store.query(
-        query_embedding=query_embedding,
-        n_results=request.limit,
-        practice_area_ids=practice_area_ids if practice_area_ids else None,
+    # Hybrid (vector + lexical) retrieval; filters are applied inside both stages
+    filters = _metadata_filters(request)
+    search_key = search_service.search_key(
+        request.query, current_user.id, practice_area_ids, filters, request.group_by_document
     )
+    if cursor is not None and cursor.get("search") != search_key:
+        # Checked before retrieval, so a stale cursor costs nothing
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not belong to this search",
+        )
+    
+    # Ranked hits are cached per search, so later pages skip embedding and retrieval.
+    # Flat pages rank one hit past the page (to know whether another exists);
+    # candidate facets count the full candidate list.
+    ranked_task = search_service.ranked_hits(
+        query=request.query,
+        user_id=current_user.id,
+        practice_area_ids=practice_area_ids,
+        filters=filters,
+        grouped=request.group_by_document,
+        depth=None if request.facets else offset + request.limit + 1,
+    )
+    keyword_facets = None
+    if request.facets and request.keyword_facets:
+        # The SQL aggregate overlaps retrieval and gives up after its budget
+        ranked, keyword_facets = await asyncio.gather(
+            ranked_task,
+            search_service.keyword_facets(request.query, practice_area_ids, filters),
+        )
+    else:
+        ranked = await ranked_task
+    hits = ranked["hits"]
+    timings = ranked["timings"]
+    
+    facets = None
+    if request.facets:
+        if keyword_facets is not None:
+            facets = SearchFacets(**keyword_facets, scope="keyword_matches")
+        else:
+            stage_started = time.perf_counter()
+            facets = SearchFacets(**search_service.candidate_facets(hits))
+            timings["facets_ms"] = round((time.perf_counter() - stage_started) * 1000, 2)
     
-    # Format results
-    search_results = []
-    for idx, doc in enumerate(results["documents"]):
-        metadata = results["metadatas"][idx] if results["metadatas"] else {}
-        
-        # Filter by content type if specified
-        if request.content_types:
-            doc_type = metadata.get("content_type", "article")
-            if doc_type not in [ct.value for ct in request.content_types]:
-                continue
-        
-        search_results.append(
-            SearchResult(
-                document_id=metadata.get("document_id", ""),
-                title=metadata.get("title", "Unknown"),
-                content_preview=doc[:300] + "..." if len(doc) > 300 else doc,
-                practice_area=metadata.get("practice_area_name", "Unknown"),
-                content_type=metadata.get("content_type", "article"),
-                similarity=1 - results["distances"][idx] if results["distances"] else 0,
+    def next_cursor(available: int) -> Optional[str]:
+        if offset + request.limit >= available and ranked["complete"]:
+            return None
+        return encode_cursor({"search": ranked["key"], "offset": offset + request.limit})
+    
+    if not request.group_by_document:
+        search_results = [_search_result(hit) for hit in hits[offset:offset + request.limit]]
+        return SearchResponse(
+            results=search_results,
+            query=request.query,
+            total_results=len(search_results),
+            timings=timings,
+            next_cursor=next_cursor(len(hits)),
+            facets=facets,
+        )
+    
+    stage_started = time.perf_counter()
+    groups = group_top_hits(
+        [hit["metadata"].get("document_id", "") for hit in hits],
+        np.asarray([hit["score"] for hit in hits], dtype=np.float64),
+        how=request.group_score,
+        top_k=settings.SEARCH_GROUP_TOP_K,
+        per_group=request.passages_per_document,
+    )
+    
+    documents = []
+    for document_id, score, match_count, best in groups[offset:offset + request.limit]:
+        passages = [_search_result(hits[idx]) for idx in best]
+        documents.append(
+            DocumentSearchResult(
+                document_id=document_id,
+                title=passages[0].title,
+                practice_area=passages[0].practice_area,
+                content_type=passages[0].content_type,
+                published_at=passages[0].published_at,
+                score=score,
+                match_count=match_count,
+                passages=passages,
             )
         )
+    timings["grouping_ms"] = round((time.perf_counter() - stage_started) * 1000, 2)
     
     return SearchResponse(
-        results=search_results,
+        # Best passage per document, for clients that only read flat results
+        results=[doc.passages[0] for doc in documents],
         query=request.query,
-        total_results=len(search_results),
+        total_results=len(documents),
+        timings=timings,
+        documents=documents,
+        next_cursor=next_cursor(len(groups)),
+        facets=facets,
+    )
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(8, ge=1, le=20),
+    current_user: User = Depends(get_current_user),
+):
+    """Typeahead over document titles and authors in the user's practice areas.
+    
+    Served from an in-memory prefix index: no embedding, vector or database
+    call per keystroke.
+    """
+    practice_area_ids = _practice_area_ids(None, current_user)
+    if practice_area_ids is None:
+        return SuggestResponse(query=q, suggestions=[])
+    
+    suggestions = suggest_index.suggest(q, practice_area_ids, limit=limit)
+    return SuggestResponse(
+        query=q,
+        suggestions=[Suggestion(**suggestion) for suggestion in suggestions],
+    )
+
+
+@router.post("/batch", response_model=BatchSearchResponse)
+async def batch_search(
+    request: BatchSearchRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Run several vector searches with one embedding call and batched index queries."""
+    if settings.RATE_LIMIT_ENABLED:
+        await rate_limiter.check(current_user, "search", cost=len(request.queries))
+    
+    searches = []
+    allowed = []
+    for item in request.queries:
+        practice_area_ids = _practice_area_ids(item.practice_area_ids, current_user)
+        allowed.append(practice_area_ids is not None)
+        if practice_area_ids is not None:
+            searches.append({
+                "query": item.query,
+                "practice_area_ids": practice_area_ids,
+                "filters": _metadata_filters(item),
+                "limit": item.limit,
+            })
+    
+    batch = await search_service.batch(searches) if searches else {"hits": [], "timings": {}}
+    
+    # Queries the user may not search get empty results, in request order
+    hits_per_search = iter(batch["hits"])
+    results = []
+    for item, is_allowed in zip(request.queries, allowed):
+        hits = next(hits_per_search) if is_allowed else []
+        search_results = [_search_result(hit) for hit in hits]
+        results.append(
+            SearchResponse(
+                results=search_results,
+                query=item.query,
+                total_results=len(search_results),
+            )
+        )
+    
+    return BatchSearchResponse(results=results, timings=batch["timings"])
+
+
+def _practice_area_ids(requested: Optional[List[int]], user: User) -> Optional[List[int]]:
+    """Practice areas to search, or None if the user may not search at all.
+    
+    Defaults to the user's practice areas; an empty list (admins without
+    practice areas) searches everything.
+    """
+    practice_area_ids = requested or [pa.id for pa in user.practice_areas]
+    if not practice_area_ids and not user.is_admin:
+        return None
+    return practice_area_ids
+
+
+def _metadata_filters(request: Union[SearchRequest, BatchSearchQuery]) -> MetadataFilters:
+    return MetadataFilters(
+        content_types=[ct.value for ct in request.content_types] if request.content_types else None,
+        published_from=request.published_from,
+        published_to=request.published_to,
+        author=request.author,
+    )
+
+
+def _search_result(hit: Dict[str, Any]) -> SearchResult:
+    """Format a retrieval hit as a search result."""
+    metadata = hit["metadata"]
+    doc = hit["content"]
+    published_at_ts = metadata.get("published_at_ts")
+    
+    return SearchResult(
+        document_id=metadata.get("document_id", ""),
+        title=metadata.get("title", "Unknown"),
+        content_preview=doc[:300] + "..." if len(doc) > 300 else doc,
+        practice_area=metadata.get("practice_area_name", "Unknown"),
+        content_type=metadata.get("content_type", "article"),
+        similarity=hit["similarity"],
+        published_at=datetime.utcfromtimestamp(published_at_ts) if published_at_ts else None,
     )
 
 
@@ -86,22 +275,25 @@ async def search(
 async def list_documents(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     practice_area_id: Optional[int] = None,
     content_type: Optional[ContentType] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """List documents accessible to the user."""
-    # Build query
+    """List documents accessible to the user, newest first.
+    
+    Pass `next_cursor` as `cursor` to page without OFFSET; cursor pages omit
+    the total. Without a cursor, `page` is honoured and the total is
+    counted up to DOCUMENT_COUNT_CAP (`total_capped` is set past it).
+    """
     query = select(Document)
-    count_query = select(func.count(Document.id))
     
     # Filter by user's practice areas unless admin
     if not current_user.is_admin:
         user_pa_ids = [pa.id for pa in current_user.practice_areas]
         if user_pa_ids:
             query = query.where(Document.practice_area_id.in_(user_pa_ids))
-            count_query = count_query.where(Document.practice_area_id.in_(user_pa_ids))
         else:
             return DocumentListResponse(
                 documents=[],
@@ -113,44 +305,39 @@ async def list_documents(
     # Additional filters
     if practice_area_id:
         query = query.where(Document.practice_area_id == practice_area_id)
-        count_query = count_query.where(Document.practice_area_id == practice_area_id)
     
     if content_type:
         query = query.where(Document.content_type == content_type)
-        count_query = count_query.where(Document.content_type == content_type)
     
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    filtered = query
+    try:
+        query = seek_newest_first(query, Document.created_at, Document.id, cursor, page_size)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    if not cursor:
+        query = query.offset((page - 1) * page_size)
     
-    # Paginate
-    offset = (page - 1) * page_size
-    query = query.order_by(Document.created_at.desc()).offset(offset).limit(page_size)
+    documents = list((await db.execute(query)).scalars().all())
     
-    result = await db.execute(query)
-    documents = list(result.scalars().all())
+    total = None
+    total_capped = False
+    if not cursor:
+        # Bounded count: an exact one scans every matching row on every page
+        counted = filtered.with_only_columns(Document.id).limit(DOCUMENT_COUNT_CAP + 1).subquery()
+        total = (await db.execute(select(func.count()).select_from(counted))).scalar()
+        if total > DOCUMENT_COUNT_CAP:
+            total, total_capped = DOCUMENT_COUNT_CAP, True
     
     return DocumentListResponse(
-        documents=[
-            DocumentResponse(
-                id=doc.id,
-                title=doc.title,
-                description=doc.description,
-                content_type=doc.content_type,
-                practice_area_id=doc.practice_area_id,
-                file_name=doc.file_name,
-                file_size_bytes=doc.file_size_bytes,
-                source_url=doc.source_url,
-                author=doc.author,
-                published_at=doc.published_at,
-                created_at=doc.created_at,
-                chunk_count=0,  # Would need a subquery to count
-            )
-            for doc in documents
-        ],
+        documents=[DocumentResponse.model_validate(doc) for doc in documents[:page_size]],
         total=total,
+        total_capped=total_capped,
         page=page,
         page_size=page_size,
+        next_cursor=next_keyset_cursor(documents, page_size, "created_at"),
     )
 
 
@@ -27,7 +27,29 @@ class Settings(BaseSettings):
     
     # Anthropic Claude API
     ANTHROPIC_API_KEY: str = ""
-    CLAUDE_MODEL: str = "claude-sonnet-4-20250514"
+    CLAUDE_MODEL: str = "claude-sonnet-4-20250514"  # Deep model for long-form analysis
+    FAST_MODEL: str = "claude-3-5-haiku-20241022"  # Fast model for short questions and follow-ups
+    DEEP_MAX_TOKENS: int = 4096
+    FAST_MAX_TOKENS: int = 1024
+    ROUTING_ENABLED: bool = True  # Off: every turn uses the deep model unless the client asks for fast
+    ROUTE_FAST_MAX_QUERY_CHARS: int = 200
+    ROUTE_FAST_MAX_CONTEXT_TOKENS: int = 1500
+    LLM_MAX_CONCURRENCY: int = 256  # Concurrent generations (including open streams) per worker
+    LLM_QUEUE_MAX: int = 512  # Calls waiting for a slot before new ones are shed
+    LLM_QUEUE_MAX_WAIT_SECONDS: float = 20.0
+    LLM_INTERACTIVE_RESERVED_SLOTS: int = 32  # Slots background work (summaries) never takes
+    LLM_MAX_CONNECTIONS: int = 256
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 64
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    LLM_READ_TIMEOUT_SECONDS: float = 120.0
+    LLM_MAX_RETRIES: int = 2
+    PROMPT_CACHE_ENABLED: bool = True  # Mark the system prompt and history as a cacheable prefix
+    
+    # Semantic answer cache (first-turn questions only)
+    ANSWER_CACHE_ENABLED: bool = False
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
     
     # Vector Database
     CHROMA_PERSIST_DIRECTORY: str = "./chroma_db"
@@ -35,6 +57,49 @@ class Settings(BaseSettings):
     PINECONE_ENVIRONMENT: str = ""
     PINECONE_INDEX_NAME: str = "futurum-insights"
     
+    # Retrieval
+    HYBRID_SEARCH_ENABLED: bool = True  # Fuse Postgres full-text hits with vector hits
+    HYBRID_CANDIDATES: int = 50  # Candidates over-fetched from each retriever before fusion
+    RRF_K: int = 60  # Reciprocal rank fusion damping constant
+    MMR_ENABLED: bool = True  # Diversify the final selection with maximal marginal relevance
+    MMR_LAMBDA: float = 0.7  # 1.0 = relevance only, 0.0 = diversity only
+    RERANKER_MODEL: str = ""  # Optional cross-encoder, e.g. "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_BUDGET_MS: int = 150  # Fall back to fused ranking if reranking exceeds this
+    RERANK_WORKERS: int = 1  # Scoring threads; requests skip reranking while all are busy
+    SEARCH_MAX_OVERFETCH: int = 10  # Cap on candidate over-fetch when hits must be post-filtered
+    SEARCH_PAGE_DEPTH: int = 100  # Cap on ranked hits per search; ranked lazily as pages are requested
+    SEARCH_GROUP_MAX_HITS: int = 500  # Chunks fetched and kept per grouped search
+    SEARCH_GROUP_TOP_K: int = 3  # Hits summed per document by the "sum_top_k" group score
+    SEARCH_CURSOR_CACHE_ENTRIES: int = 256  # Searches whose ranked hits are kept for paging
+    SEARCH_CURSOR_TTL_SECONDS: int = 300
+    SEARCH_FACET_BUDGET_MS: int = 150  # Keyword-match (SQL) facets are dropped if they exceed this
+    SUGGEST_MAX_CANDIDATES: int = 1000  # Matches ranked per typeahead query, split across practice areas
+    SUGGEST_REFRESH_MINUTES: int = 10  # Rebuilds pick up other workers' ingestion; 0 disables
+    RAG_CONTEXT_CHUNKS: int = 8  # Chunks retrieved per chat turn, before merging and packing
+    CONTEXT_TOKEN_BUDGET: int = 6000  # Token budget for retrieved sources in the system prompt
+    CONTEXT_MIN_SOURCE_TOKENS: int = 100  # Smallest truncated source worth including
+    
+    # Conversation history
+    HISTORY_MAX_MESSAGES: int = 10  # Recent messages always sent verbatim; older ones wait for the summary fold
+    SUMMARY_ENABLED: bool = True  # Fold older messages into a rolling summary
+    SUMMARY_FOLD_BATCH: int = 10  # Messages outside the window before the summary is updated
+    SUMMARY_MODEL: str = "claude-3-5-haiku-20241022"
+    SUMMARY_MAX_TOKENS: int = 512
+    
+    # Chat pipeline
+    CHAT_PREPARE_DEADLINE_SECONDS: float = 15.0  # Deadline for everything before the LLM call
+    STREAM_COALESCE_MS: int = 50  # Max time a streamed token waits to be batched
+    STREAM_COALESCE_CHARS: int = 64  # Flush a streamed delta once it reaches this size
+    
+    # Rate limiting (token buckets per user and per company; capacity is one minute of refill)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_CHAT_USER_PER_MINUTE: int = 20
+    RATE_LIMIT_CHAT_COMPANY_PER_MINUTE: int = 200
+    RATE_LIMIT_SEARCH_USER_PER_MINUTE: int = 120
+    RATE_LIMIT_SEARCH_COMPANY_PER_MINUTE: int = 1200
+    RATE_LIMIT_TOKENS_USER_PER_MINUTE: int = 200000  # LLM input + output tokens
+    RATE_LIMIT_TOKENS_COMPANY_PER_MINUTE: int = 2000000
+    
     # Embeddings
     EMBEDDING_MODEL: str = "text-embedding-3-small"
     OPENAI_API_KEY: str = ""
@@ -43,6 +108,18 @@ class Settings(BaseSettings):
     UPLOAD_DIRECTORY: str = "./uploads"
     MAX_UPLOAD_SIZE_MB: int = 50
     
+    # Ingestion
+    INGESTION_STREAMING_THRESHOLD_MB: int = 5  # Files at or above this size are ingested in streaming mode
+    INGESTION_BATCH_SIZE: int = 64  # Chunks embedded and flushed per batch in streaming mode
+    
+    # Vector store <-> database reconciliation
+    RECONCILE_INTERVAL_MINUTES: int = 0  # 0 disables the scheduled job
+    RECONCILE_AUTO_REPAIR: bool = False
+    RECONCILE_PAGE_SIZE: int = 5000
+    RECONCILE_BLOOM_ERROR_RATE: float = 0.001
+    RECONCILE_GRACE_MINUTES: int = 30  # Skip vectors younger than this (ingestion may be in flight)
+    RECONCILE_MAX_REPAIRS: int = 100000  # Per-run cap on deleted or re-embedded items
+    
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
     
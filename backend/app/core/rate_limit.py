@@ -0,0 +1,158 @@
+"""Token-bucket rate limiting per user and per company."""
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, List, NamedTuple, Optional, Tuple
+
+from fastapi import Depends, HTTPException, status
+
+from app.core.config import settings
+from app.core.security import get_current_user
+
+if TYPE_CHECKING:
+    from app.models.user import User
+
+
+class Bucket(NamedTuple):
+    """A token bucket and the cost to take from it."""
+    key: str
+    capacity: float
+    refill_per_second: float
+    cost: float = 1.0
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets.
+
+    Implementations must apply `acquire` atomically across all buckets, so a
+    shared store (e.g. Redis with a Lua script) can replace the in-memory one
+    when running several workers.
+    """
+
+    @abstractmethod
+    async def acquire(self, buckets: List[Bucket]) -> float:
+        """Take `cost` from every bucket, or from none.
+
+        Returns 0 on success, otherwise the seconds until all buckets can pay.
+        """
+
+    @abstractmethod
+    async def charge(self, buckets: List[Bucket]) -> None:
+        """Take `cost` from every bucket unconditionally; balances may go negative."""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Process-local buckets, bounded by evicting the least recently used.
+
+    Operations never await while touching state, so they are atomic on the
+    event loop. An evicted bucket comes back full.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def _level(self, bucket: Bucket, now: float) -> float:
+        tokens, updated_at = self._buckets.get(bucket.key, (bucket.capacity, now))
+        return min(bucket.capacity, tokens + (now - updated_at) * bucket.refill_per_second)
+
+    def _store(self, key: str, tokens: float, now: float) -> None:
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    async def acquire(self, buckets: List[Bucket]) -> float:
+        now = time.monotonic()
+        levels = [self._level(bucket, now) for bucket in buckets]
+
+        wait = 0.0
+        for bucket, level in zip(buckets, levels):
+            if level < bucket.cost:
+                wait = max(wait, (bucket.cost - level) / bucket.refill_per_second)
+        if wait > 0:
+            return wait
+
+        for bucket, level in zip(buckets, levels):
+            self._store(bucket.key, level - bucket.cost, now)
+        return 0.0
+
+    async def charge(self, buckets: List[Bucket]) -> None:
+        now = time.monotonic()
+        for bucket in buckets:
+            self._store(bucket.key, self._level(bucket, now) - bucket.cost, now)
+
+
+class RateLimiter:
+    """Request and LLM-token budgets per user and per company.
+
+    Each scope ("chat", "search") has its own request buckets. LLM tokens are
+    charged after the fact from `response.usage`, so a user who overspends is
+    rejected until the token bucket is positive again. Bucket capacity is one
+    minute's worth of refill.
+    """
+
+    def __init__(self, backend: Optional[RateLimitBackend] = None):
+        self.backend = backend or InMemoryRateLimitBackend()
+
+    @staticmethod
+    def _owners(user: "User") -> List[Tuple[str, str]]:
+        """(kind, id) pairs the budgets apply to: the user and, if set, their company."""
+        owners = [("user", str(user.id))]
+        if user.company_name and user.company_name.strip():
+            owners.append(("company", user.company_name.strip().lower()))
+        return owners
+
+    @staticmethod
+    def _per_minute(kind: str, scope: str) -> float:
+        return getattr(settings, f"RATE_LIMIT_{scope.upper()}_{kind.upper()}_PER_MINUTE")
+
+    def _request_buckets(self, user: "User", scope: str, cost: float) -> List[Bucket]:
+        buckets = []
+        for kind, owner_id in self._owners(user):
+            per_minute = self._per_minute(kind, scope)
+            buckets.append(Bucket(f"{scope}:{kind}:{owner_id}", per_minute, per_minute / 60, cost))
+        return buckets
+
+    def _token_buckets(self, user: "User", cost: float) -> List[Bucket]:
+        buckets = []
+        for kind, owner_id in self._owners(user):
+            per_minute = self._per_minute(kind, "tokens")
+            buckets.append(Bucket(f"tokens:{kind}:{owner_id}", per_minute, per_minute / 60, cost))
+        return buckets
+
+    async def check(self, user: "User", scope: str, uses_llm: bool = False, cost: float = 1) -> None:
+        """Take `cost` requests from the user's budgets or raise 429 with Retry-After."""
+        buckets = self._request_buckets(user, scope, cost)
+        if uses_llm:
+            # Zero cost: only requires the token budget not to be in debt
+            buckets += self._token_buckets(user, 0)
+
+        wait = await self.backend.acquire(buckets)
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    async def record_tokens(self, user: "User", tokens: int) -> None:
+        """Charge LLM tokens used by a request to the user's token budgets."""
+        if settings.RATE_LIMIT_ENABLED and tokens > 0:
+            await self.backend.charge(self._token_buckets(user, tokens))
+
+
+# Singleton instance
+rate_limiter = RateLimiter()
+
+
+def rate_limited(scope: str, uses_llm: bool = False) -> Callable:
+    """Dependency returning the current user after taking a request from their budgets."""
+
+    async def dependency(current_user: "User" = Depends(get_current_user)) -> "User":
+        if settings.RATE_LIMIT_ENABLED:
+            await rate_limiter.check(current_user, scope, uses_llm=uses_llm)
+        return current_user
+
+    return dependency
@@ -0,0 +1,4 @@
+"""Offline retrieval evaluation and latency benchmarks.
+
+Run with `python -m app.evaluation --help`.
+"""
@@ -0,0 +1,57 @@
+"""Command-line entry point: `python -m app.evaluation`."""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Dict, List
+
+from app.evaluation.harness import apply_gates, evaluate, load_fixture
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "sample.json")
+
+
+def _parse_gates(values: List[str]) -> Dict[str, float]:
+    gates = {}
+    for value in values:
+        name, sep, threshold = value.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Gate must look like NAME=VALUE: {value}")
+        gates[name.strip()] = float(threshold)
+    return gates
+
+
+async def _main(args: argparse.Namespace) -> int:
+    gates = _parse_gates(args.gate)
+    report = await evaluate(
+        load_fixture(args.fixture),
+        ks=args.k,
+        n_results=args.n_results,
+        repeat=args.repeat,
+    )
+    report["fixture"] = args.fixture
+    passed = apply_gates(report, gates)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and latency on a labelled fixture.")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="Fixture JSON with documents and labelled queries")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 10], help="Cutoffs for recall@k and nDCG@k")
+    parser.add_argument("--n-results", type=int, default=10, help="Chunks retrieved per query")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query for latency samples")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument(
+        "--gate",
+        action="append",
+        default=[],
+        help="Fail (exit 1) unless NAME=VALUE holds, e.g. recall@5=0.8 (minimum) or total_ms.p95=200 (maximum)",
+    )
+    sys.exit(asyncio.run(_main(parser.parse_args())))
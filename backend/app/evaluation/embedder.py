@@ -0,0 +1,38 @@
+"""Deterministic offline embedder for evaluation runs."""
+import hashlib
+import re
+from typing import List
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """Bag-of-words embeddings via the hashing trick; no network or model files.
+
+    Implements the parts of EmbeddingService that retrieval and indexing use,
+    so it can be passed to HybridRetriever in its place. Scores are only
+    meaningful relative to each other within one run.
+    """
+
+    def __init__(self, dimension: int = 512):
+        self.dimension = dimension
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            # Low bits pick the dimension, one high bit the sign
+            vector[value % self.dimension] += 1.0 if value >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
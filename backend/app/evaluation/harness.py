@@ -0,0 +1,172 @@
+"""Retrieval evaluation over a labelled fixture corpus."""
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from app.core.config import settings
+from app.evaluation.embedder import HashingEmbedder
+from app.evaluation.metrics import ndcg_at_k, percentiles, recall_at_k, reciprocal_rank
+from app.services.embeddings import EmbeddingService
+from app.services.ingestion import IngestionService
+from app.services.rag import RAGService
+from app.services.retrieval import HybridRetriever
+from app.services.vector_store import VectorStore
+
+
+def load_fixture(path: str) -> Dict[str, Any]:
+    """Load a fixture: {"documents": [...], "queries": [...]}.
+
+    Documents have `id`, `title`, `content`, `practice_area_id`,
+    `practice_area` and `content_type`. Queries have `query`, `relevant`
+    (document IDs) and optional `practice_area_ids`.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+async def build_index(
+    documents: List[Dict[str, Any]],
+    store: VectorStore,
+    embedder: Any,
+    chunker: IngestionService,
+) -> int:
+    """Chunk and embed fixture documents into the store, as ingestion would; returns the chunk count."""
+    total = 0
+    for doc in documents:
+        chunks = chunker.chunk_text(doc["content"])
+        if not chunks:
+            continue
+
+        embeddings = await embedder.generate_embeddings([chunk[0] for chunk in chunks])
+        await store.add_documents(
+            ids=[
+                EmbeddingService.generate_vector_id(text, doc["id"], idx)
+                for idx, (text, _, _) in enumerate(chunks)
+            ],
+            embeddings=embeddings,
+            documents=[chunk[0] for chunk in chunks],
+            metadatas=[
+                {
+                    "document_id": doc["id"],
+                    "chunk_index": idx,
+                    "start_char": start_char,
+                    "end_char": end_char,
+                    "practice_area_id": doc["practice_area_id"],
+                    "practice_area_name": doc["practice_area"],
+                    "title": doc["title"],
+                    "content_type": doc["content_type"],
+                    "ingested_at": int(time.time()),
+                }
+                for idx, (_, start_char, end_char) in enumerate(chunks)
+            ],
+        )
+        total += len(chunks)
+    return total
+
+
+def _ranked_documents(contexts: List[Dict[str, Any]]) -> List[str]:
+    """Document IDs in first-seen order; metrics are computed per document."""
+    seen: Dict[str, None] = {}
+    for ctx in contexts:
+        if ctx["document_id"]:
+            seen.setdefault(ctx["document_id"], None)
+    return list(seen)
+
+
+async def evaluate(
+    fixture: Dict[str, Any],
+    ks: Sequence[int] = (1, 3, 5, 10),
+    n_results: int = 10,
+    repeat: int = 1,
+    embedder: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """Index the fixture in an in-memory collection and score RAGService.retrieve_context.
+
+    Quality metrics come from the first run of each query; latency samples
+    from all `repeat` runs. Lexical search needs Postgres and is not part of
+    the offline run.
+    """
+    embedder = embedder or HashingEmbedder()
+    client = chromadb.EphemeralClient(settings=ChromaSettings(anonymized_telemetry=False))
+    store = VectorStore(client=client, collection_name=f"evaluation_{uuid.uuid4().hex}")
+    rag = RAGService(retriever=HybridRetriever(embedder, store))
+
+    try:
+        chunk_count = await build_index(fixture["documents"], store, embedder, IngestionService())
+
+        per_query = []
+        latency: Dict[str, List[float]] = {}
+        for item in fixture["queries"]:
+            relevant = set(item["relevant"])
+            ranked: List[str] = []
+            for run in range(repeat):
+                started = time.perf_counter()
+                contexts, timings = await rag.retrieve_context(
+                    query=item["query"],
+                    practice_area_ids=item.get("practice_area_ids") or [],
+                    n_results=n_results,
+                )
+                latency.setdefault("end_to_end_ms", []).append((time.perf_counter() - started) * 1000)
+                for stage, value in timings.items():
+                    latency.setdefault(stage, []).append(value)
+                if run == 0:
+                    ranked = _ranked_documents(contexts)
+
+            scores = {f"recall@{k}": recall_at_k(ranked, relevant, k) for k in ks}
+            scores.update({f"ndcg@{k}": ndcg_at_k(ranked, relevant, k) for k in ks})
+            scores["mrr"] = reciprocal_rank(ranked, relevant)
+            per_query.append({"query": item["query"], "relevant": sorted(relevant), "retrieved": ranked, **scores})
+    finally:
+        client.delete_collection(store.collection.name)
+        await rag.close()
+
+    metric_names = [name for name in per_query[0] if name not in ("query", "relevant", "retrieved")] if per_query else []
+    quality = {
+        name: round(sum(row[name] for row in per_query) / len(per_query), 4)
+        for name in metric_names
+    }
+
+    return {
+        "documents": len(fixture["documents"]),
+        "chunks": chunk_count,
+        "queries": len(per_query),
+        "config": {
+            "embedder": type(embedder).__name__,
+            "n_results": n_results,
+            "repeat": repeat,
+            "hybrid_candidates": settings.HYBRID_CANDIDATES,
+            "mmr_enabled": settings.MMR_ENABLED,
+            "mmr_lambda": settings.MMR_LAMBDA,
+            "lexical": False,
+        },
+        "quality": quality,
+        "latency_ms": {stage: percentiles(samples) for stage, samples in latency.items()},
+        "per_query": per_query,
+    }
+
+
+def apply_gates(report: Dict[str, Any], gates: Dict[str, float]) -> bool:
+    """Check report values against gates and record the outcome in the report.
+
+    Gate names are quality metrics ("recall@5", "mrr", ...) checked as
+    minimums, or "<stage>.<percentile>" latencies ("total_ms.p95") checked
+    as maximums.
+    """
+    results = {}
+    for name, threshold in gates.items():
+        if name in report["quality"]:
+            value = report["quality"][name]
+            passed = value >= threshold
+        else:
+            stage, _, point = name.partition(".")
+            value = report["latency_ms"].get(stage, {}).get(point)
+            passed = value is not None and value <= threshold
+        results[name] = {"threshold": threshold, "value": value, "passed": passed}
+
+    report["gates"] = results
+    report["passed"] = all(result["passed"] for result in results.values())
+    return report["passed"]
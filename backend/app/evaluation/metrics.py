@@ -0,0 +1,39 @@
+"""Ranking quality and latency metrics."""
+import math
+from typing import Dict, Iterable, Sequence, Set
+
+
+def recall_at_k(ranked: Sequence[str], relevant: Set[str], k: int) -> float:
+    """Fraction of relevant items found in the top k."""
+    if not relevant:
+        return 0.0
+    return len(set(ranked[:k]) & relevant) / len(relevant)
+
+
+def reciprocal_rank(ranked: Sequence[str], relevant: Set[str]) -> float:
+    """1 / rank of the first relevant item, or 0 if none was retrieved."""
+    for rank, item in enumerate(ranked, start=1):
+        if item in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(ranked: Sequence[str], relevant: Set[str], k: int) -> float:
+    """Normalized discounted cumulative gain with binary relevance."""
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, item in enumerate(ranked[:k], start=1) if item in relevant)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+def percentiles(samples: Iterable[float], points: Sequence[float] = (50, 90, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of a sample, keyed like "p95"."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    result = {}
+    for point in points:
+        idx = min(len(ordered) - 1, max(0, math.ceil(point / 100 * len(ordered)) - 1))
+        result[f"p{point:g}"] = round(ordered[idx], 2)
+    result["max"] = round(ordered[-1], 2)
+    return result
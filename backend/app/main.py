@@ -1,13 +1,22 @@
 """FastAPI application entry point."""
+import asyncio
+import math
 import os
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.core.database import init_db
 from app.api import auth, chat, search, admin
+from app.services.admission import AdmissionRejected
+from app.services.rag import rag_service
+from app.services.reranker import load_reranker
+from app.services.retrieval import hybrid_retriever
+from app.services.reconciliation import reconciliation_service
+from app.services.suggest import suggest_index
 
 
 @asynccontextmanager
@@ -20,10 +29,28 @@ async def lifespan(app: FastAPI):
     os.makedirs(settings.UPLOAD_DIRECTORY, exist_ok=True)
     os.makedirs(settings.CHROMA_PERSIST_DIRECTORY, exist_ok=True)
     
+    # Optional cross-encoder for second-stage retrieval
+    hybrid_retriever.set_reranker(await asyncio.to_thread(load_reranker))
+    
+    # Title/author typeahead index, kept current by ingestion and periodic rebuilds
+    await suggest_index.load()
+    suggest_task = None
+    if settings.SUGGEST_REFRESH_MINUTES > 0:
+        suggest_task = asyncio.create_task(suggest_index.run_periodically())
+    
+    # Scheduled vector store <-> database reconciliation
+    reconcile_task = None
+    if settings.RECONCILE_INTERVAL_MINUTES > 0:
+        reconcile_task = asyncio.create_task(reconciliation_service.run_periodically())
+    
     yield
     
     # Shutdown
-    pass
+    if suggest_task:
+        suggest_task.cancel()
+    if reconcile_task:
+        reconcile_task.cancel()
+    await rag_service.close()
 
 
 app = FastAPI(
@@ -40,8 +67,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# LLM admission control sheds load with 503
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Map a shed LLM call to 503 with Retry-After."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": exc.reason},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
 # Include routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["Authentication"])
 app.include_router(chat.router, prefix=f"{settings.API_V1_PREFIX}/chat", tags=["Chat"])
@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, Enum as SQLEnum, ForeignKey, String, Text
+from sqlalchemy import Column, DateTime, Enum as SQLEnum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -21,12 +21,23 @@ class Conversation(Base):
     """Conversation model for storing chat sessions."""
     
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index("ix_conversations_user_id_updated_at_id", "user_id", "updated_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     title = Column(String(255), nullable=True)
     
+    # Rolling summary of messages that have left the history window
+    summary = Column(Text, nullable=True)
+    summary_message_count = Column(Integer, default=0, server_default="0", nullable=False)
+    # (created_at, id) of the last summarized message; created_at alone can tie
+    summary_through = Column(DateTime, nullable=True)
+    summary_through_id = Column(UUID(as_uuid=True), nullable=True)
+    message_count = Column(Integer, default=0, server_default="0", nullable=False)
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -43,6 +54,10 @@ class Message(Base):
     """Message model for storing individual chat messages."""
     
     __tablename__ = "messages"
+    __table_args__ = (
+        # Also serves newest-first keyset paging of a conversation's messages
+        Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
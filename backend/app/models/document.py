@@ -4,8 +4,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, Enum as SQLEnum, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, Computed, DateTime, Enum as SQLEnum, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID, JSONB
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -26,6 +26,11 @@ class Document(Base):
     """Document model for storing content metadata."""
     
     __tablename__ = "documents"
+    __table_args__ = (
+        # Keyset pagination, newest first, overall and within a practice area
+        Index("ix_documents_created_at_id", "created_at", "id"),
+        Index("ix_documents_practice_area_id_created_at_id", "practice_area_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(500), nullable=False)
@@ -49,6 +54,11 @@ class Document(Base):
     # Additional metadata (companies mentioned, tags, etc.)
     metadata = Column(JSONB, default=dict, nullable=False)
     
+    # Content totals, set in the ingestion transaction so listings never count chunks
+    chunk_count = Column(Integer, default=0, server_default="0", nullable=False)
+    token_count = Column(Integer, default=0, server_default="0", nullable=False)
+    char_count = Column(Integer, default=0, server_default="0", nullable=False)
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -64,6 +74,9 @@ class DocumentChunk(Base):
     """Document chunk model for storing vectorized content pieces."""
     
     __tablename__ = "document_chunks"
+    __table_args__ = (
+        Index("ix_document_chunks_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
@@ -72,6 +85,13 @@ class DocumentChunk(Base):
     content = Column(Text, nullable=False)
     chunk_index = Column(Integer, nullable=False)
     
+    # Full-text search vector for lexical retrieval, maintained by Postgres
+    content_tsv = Column(
+        TSVECTOR,
+        Computed("to_tsvector('english', content)", persisted=True),
+        nullable=True,
+    )
+    
     # Vector database reference
     vector_id = Column(String(255), nullable=True, index=True)
     
@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 from typing import List
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Table
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Table
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -23,6 +23,9 @@ class User(Base):
     """User model for authentication and authorization."""
     
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -56,6 +59,9 @@ class PracticeArea(Base):
     slug = Column(String(100), unique=True, nullable=False)
     description = Column(String(500), nullable=True)
     
+    # Bumped in every ingestion or deletion transaction; keys the answer cache across workers
+    corpus_generation = Column(Integer, default=0, server_default="0", nullable=False)
+    
     # Relationships
     users = relationship(
         "User",
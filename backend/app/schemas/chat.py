@@ -1,6 +1,6 @@
 """Chat and conversation schemas."""
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -10,6 +10,7 @@ class ChatMessageRequest(BaseModel):
     """Chat message request."""
     message: str = Field(..., min_length=1, max_length=10000)
     conversation_id: Optional[UUID] = None
+    mode: Literal["auto", "fast", "deep"] = "auto"
 
 
 class SourceCitation(BaseModel):
@@ -49,6 +50,7 @@ class ConversationResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     messages: List[MessageResponse] = []
+    next_cursor: Optional[str] = None  # Cursor for older messages
 
     class Config:
         from_attributes = True
@@ -57,6 +59,7 @@ class ConversationResponse(BaseModel):
 class ConversationListResponse(BaseModel):
     """List of conversations."""
     conversations: List[ConversationResponse]
+    next_cursor: Optional[str] = None
 
 
 class ConversationCreateRequest(BaseModel):
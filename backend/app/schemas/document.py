@@ -1,6 +1,6 @@
 """Document and search schemas."""
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -34,6 +34,8 @@ class DocumentResponse(BaseModel):
     published_at: Optional[datetime]
     created_at: datetime
     chunk_count: int = 0
+    token_count: int = 0
+    char_count: int = 0
 
     class Config:
         from_attributes = True
@@ -42,9 +44,11 @@ class DocumentResponse(BaseModel):
 class DocumentListResponse(BaseModel):
     """List of documents."""
     documents: List[DocumentResponse]
-    total: int
+    total: Optional[int] = None  # Omitted on cursor pages
+    total_capped: bool = False  # True if there are more than `total` documents
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class SearchRequest(BaseModel):
@@ -52,7 +56,32 @@ class SearchRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=1000)
     practice_area_ids: Optional[List[int]] = None
     content_types: Optional[List[ContentType]] = None
+    published_from: Optional[datetime] = None
+    published_to: Optional[datetime] = None
+    author: Optional[str] = Field(default=None, min_length=1, max_length=255)
     limit: int = Field(default=10, ge=1, le=50)
+    group_by_document: bool = False
+    group_score: Literal["max", "sum_top_k"] = "max"
+    passages_per_document: int = Field(default=3, ge=1, le=3)
+    cursor: Optional[str] = None  # next_cursor from the previous page of the same search
+    facets: bool = False  # Count documents per practice area and content type among the candidates
+    keyword_facets: bool = False  # Count every document matching the query's keywords instead, if it fits the latency budget
+
+
+class BatchSearchQuery(BaseModel):
+    """One query in a batch search."""
+    query: str = Field(..., min_length=1, max_length=1000)
+    practice_area_ids: Optional[List[int]] = None
+    content_types: Optional[List[ContentType]] = None
+    published_from: Optional[datetime] = None
+    published_to: Optional[datetime] = None
+    author: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    limit: int = Field(default=10, ge=1, le=50)
+
+
+class BatchSearchRequest(BaseModel):
+    """Several searches answered in one request."""
+    queries: List[BatchSearchQuery] = Field(..., min_length=1, max_length=20)
 
 
 class SearchResult(BaseModel):
@@ -66,8 +95,59 @@ class SearchResult(BaseModel):
     published_at: Optional[datetime] = None
 
 
+class DocumentSearchResult(BaseModel):
+    """Document-level search result with its best passages."""
+    document_id: str
+    title: str
+    practice_area: str
+    content_type: str
+    published_at: Optional[datetime] = None
+    score: float
+    match_count: int
+    passages: List[SearchResult]
+
+
+class FacetCount(BaseModel):
+    """Number of matching documents with one facet value."""
+    value: str
+    label: str
+    count: int
+
+
+class SearchFacets(BaseModel):
+    """Facet counts for a search."""
+    practice_areas: List[FacetCount]
+    content_types: List[FacetCount]
+    scope: Literal["candidates", "keyword_matches"] = "candidates"  # Which document set was counted
+
+
 class SearchResponse(BaseModel):
     """Search response."""
     results: List[SearchResult]
     query: str
-    total_results: int
+    total_results: int  # Results in this response; next_cursor tells whether more exist
+    documents: Optional[List[DocumentSearchResult]] = None
+    next_cursor: Optional[str] = None
+    facets: Optional[SearchFacets] = None
+    timings: Optional[Dict[str, float]] = None
+
+
+class Suggestion(BaseModel):
+    """Typeahead suggestion."""
+    document_id: str
+    title: str
+    author: Optional[str] = None
+    practice_area_id: int
+    matched: Literal["title", "author"]
+
+
+class SuggestResponse(BaseModel):
+    """Typeahead suggestions for a partial query."""
+    query: str
+    suggestions: List[Suggestion]
+
+
+class BatchSearchResponse(BaseModel):
+    """Batch search response, one entry per query in request order."""
+    results: List[SearchResponse]
+    timings: Optional[Dict[str, float]] = None
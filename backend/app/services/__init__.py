@@ -1,16 +1,34 @@
 """Business logic services."""
 from app.services.embeddings import embedding_service, EmbeddingService
 from app.services.vector_store import vector_store, VectorStore
+from app.services.lexical_search import lexical_search_service, LexicalSearchService
+from app.services.retrieval import hybrid_retriever, HybridRetriever
+from app.services.search import search_service, SearchService
+from app.services.suggest import suggest_index, SuggestIndex
 from app.services.ingestion import ingestion_service, IngestionService
+from app.services.admission import admission_controller, AdmissionController
 from app.services.rag import rag_service, RAGService
+from app.services.reconciliation import reconciliation_service, ReconciliationService
 
 __all__ = [
     "embedding_service",
     "EmbeddingService",
     "vector_store",
     "VectorStore",
+    "lexical_search_service",
+    "LexicalSearchService",
+    "hybrid_retriever",
+    "HybridRetriever",
+    "search_service",
+    "SearchService",
+    "suggest_index",
+    "SuggestIndex",
     "ingestion_service",
     "IngestionService",
+    "admission_controller",
+    "AdmissionController",
     "rag_service",
     "RAGService",
+    "reconciliation_service",
+    "ReconciliationService",
 ]
@@ -0,0 +1,176 @@
+"""Admission control for LLM calls: bounded concurrency with a priority queue."""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class Priority(IntEnum):
+    """Admission priority; lower values are admitted first."""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class AdmissionRejected(Exception):
+    """Raised when an LLM call is shed instead of queued or times out waiting."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Caps concurrent LLM calls and queues the rest by priority.
+
+    Interactive calls are always admitted ahead of background ones, and
+    `interactive_reserved` slots are never given to background work. Calls
+    that would overflow the queue, or whose predicted wait exceeds
+    `max_wait_seconds`, are rejected immediately rather than failing late.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait_seconds: float,
+        interactive_reserved: int = 0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.interactive_reserved = min(interactive_reserved, max_concurrency - 1)
+
+        self._active = 0
+        self._queued: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+        # Moving average of how long a slot is held, for wait prediction
+        self._hold_seconds = 5.0
+        self._waits: Deque[float] = deque(maxlen=1000)
+        self._counters: Dict[str, int] = {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_predicted_wait": 0,
+            "rejected_timeout": 0,
+        }
+
+    def _limit(self, priority: Priority) -> int:
+        if priority == Priority.BACKGROUND:
+            return self.max_concurrency - self.interactive_reserved
+        return self.max_concurrency
+
+    @property
+    def queued(self) -> int:
+        return sum(self._queued.values())
+
+    def _predicted_wait(self) -> float:
+        return (self.queued + 1) * self._hold_seconds / self.max_concurrency
+
+    def _reject(self, reason: str, counter: str) -> AdmissionRejected:
+        self._counters[counter] += 1
+        return AdmissionRejected(reason, retry_after=max(1.0, self._predicted_wait()))
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Wait for a slot; raises AdmissionRejected if shed or timed out."""
+        started = time.monotonic()
+        ahead = sum(count for queued_priority, count in self._queued.items() if queued_priority <= priority)
+        if not ahead and self._active < self._limit(priority):
+            self._active += 1
+            self._admitted(started)
+            return
+
+        if self.queued >= self.max_queue:
+            raise self._reject("LLM queue is full", "rejected_queue_full")
+        if self._predicted_wait() > self.max_wait_seconds:
+            raise self._reject("LLM queue wait would exceed the limit", "rejected_predicted_wait")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._queued[priority] += 1
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            raise self._reject("Timed out waiting for an LLM slot", "rejected_timeout")
+        except asyncio.CancelledError:
+            # Granted a slot just as the caller was cancelled: give it back
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            self._queued[priority] -= 1
+        self._admitted(started)
+
+    def _admitted(self, started: float) -> None:
+        self._counters["admitted"] += 1
+        self._waits.append(time.monotonic() - started)
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        """Free a slot, handing it to the highest-priority waiter that may take it."""
+        if held_seconds is not None:
+            self._hold_seconds = 0.9 * self._hold_seconds + 0.1 * held_seconds
+
+        self._active -= 1
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                # Timed out or cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            if self._active >= self._limit(priority):
+                break
+            heapq.heappop(self._waiters)
+            self._active += 1
+            future.set_result(None)
+            break
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[None]:
+        """Hold an LLM slot for the duration of the block."""
+        await self.acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current queue state, counters and recent wait-time percentiles."""
+        waits = sorted(self._waits)
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, math.ceil(p * len(waits)) - 1)] * 1000, 2)
+
+        return {
+            "active": self._active,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "avg_hold_seconds": round(self._hold_seconds, 3),
+            "wait_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(waits[-1] * 1000, 2) if waits else 0.0,
+            },
+            **self._counters,
+        }
+
+
+# Singleton instance
+admission_controller = AdmissionController(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_QUEUE_MAX,
+    max_wait_seconds=settings.LLM_QUEUE_MAX_WAIT_SECONDS,
+    interactive_reserved=settings.LLM_INTERACTIVE_RESERVED_SLOTS,
+)
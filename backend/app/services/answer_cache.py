@@ -0,0 +1,113 @@
+"""Semantic answer cache for repeated first-turn questions."""
+import itertools
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import PracticeArea
+from app.utils.cache import TTLCache
+
+
+class AnswerCache:
+    """Cache of generated answers keyed by query embedding similarity.
+
+    Entries are partitioned by the user's practice-area set and the corpus
+    generation of those practice areas. Entries live in each process, but the
+    generations are stored on `practice_areas` and bumped inside every
+    ingestion or deletion transaction, so a change made through any worker
+    makes every worker's answers that could have drawn on it unreachable.
+    """
+
+    def __init__(self):
+        self._entries = TTLCache(settings.ANSWER_CACHE_MAX_ENTRIES, settings.ANSWER_CACHE_TTL_SECONDS)
+        self._ids = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ANSWER_CACHE_ENABLED
+
+    async def generation(self, practice_area_ids: List[int]) -> Hashable:
+        """Current corpus generation for a practice-area set (all areas when empty).
+
+        Tagged as ("all", total) or ("areas", ((id, generation), ...)).
+        """
+        async with AsyncSessionLocal() as session:
+            if not practice_area_ids:
+                total = (await session.execute(select(func.sum(PracticeArea.corpus_generation)))).scalar()
+                return ("all", total or 0)
+            rows = (await session.execute(
+                select(PracticeArea.id, PracticeArea.corpus_generation)
+                .where(PracticeArea.id.in_(set(practice_area_ids)))
+            )).all()
+        return ("areas", tuple(sorted((row.id, row.corpus_generation) for row in rows)))
+
+    @staticmethod
+    async def bump_generation(db: AsyncSession, practice_area_id: int) -> None:
+        """Advance a practice area's corpus generation; committed with the caller's transaction."""
+        await db.execute(
+            update(PracticeArea)
+            .where(PracticeArea.id == practice_area_id)
+            .values(corpus_generation=PracticeArea.corpus_generation + 1)
+        )
+
+    def lookup(
+        self,
+        query_embedding: List[float],
+        generation: Hashable,
+    ) -> Optional[Dict[str, Any]]:
+        """Return the cached answer most similar to the query, if above the threshold."""
+        candidates = [entry for _, entry in self._entries.items() if entry["generation"] == generation]
+        if not candidates:
+            return None
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        similarities = np.stack([entry["embedding"] for entry in candidates]) @ query
+
+        best = int(np.argmax(similarities))
+        if similarities[best] < settings.ANSWER_CACHE_SIMILARITY_THRESHOLD:
+            return None
+
+        # Refresh recency of the hit
+        entry = self._entries.get(candidates[best]["id"])
+        return entry["result"] if entry else None
+
+    def store(
+        self,
+        query_embedding: List[float],
+        generation: Hashable,
+        result: Dict[str, Any],
+    ) -> None:
+        """Cache an answer computed against the given corpus generation."""
+        embedding = np.asarray(query_embedding, dtype=np.float32)
+        embedding /= np.linalg.norm(embedding) or 1.0
+
+        entry_id = next(self._ids)
+        self._entries.set(entry_id, {
+            "id": entry_id,
+            "embedding": embedding,
+            "generation": generation,
+            "result": result,
+        })
+
+    def invalidate_practice_area(self, practice_area_id: int) -> None:
+        """Evict this process's answers that may draw on a practice area's documents.
+
+        Other workers' entries are already unreachable through the bumped
+        generation; this just frees the memory early.
+        """
+        stale = []
+        for key, entry in self._entries.items():
+            scope, generations = entry["generation"]
+            if scope == "all" or any(pa_id == practice_area_id for pa_id, _ in generations):
+                stale.append(key)
+        for key in stale:
+            self._entries.pop(key)
+
+
+# Singleton instance
+answer_cache = AnswerCache()
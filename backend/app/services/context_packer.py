@@ -0,0 +1,141 @@
+"""Token-budgeted assembly of retrieved chunks into prompt sources."""
+from typing import Any, Dict, List, Optional
+
+import tiktoken
+
+from app.core.config import settings
+
+# Longest chunk overlap searched for when character offsets are unavailable
+MAX_OVERLAP_CHARS = 400
+
+
+def format_source(idx: int, ctx: Dict[str, Any]) -> str:
+    """Render one source as it appears in the system prompt."""
+    return f"""
+[Source {idx}]
+Title: {ctx['title']}
+Practice Area: {ctx['practice_area']}
+Content Type: {ctx['content_type']}
+---
+{ctx['content']}
+---
+
+"""
+
+
+def _text_overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right`."""
+    for size in range(min(len(left), len(right), MAX_OVERLAP_CHARS), 0, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+class ContextPacker:
+    """Merges adjacent chunks and packs sources into a token budget.
+
+    Tokens are counted with tiktoken's cl100k_base encoding, which tracks
+    Claude's tokenizer closely enough for budgeting.
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        self.encoding_name = encoding_name
+        self._encoding: Optional[tiktoken.Encoding] = None
+
+    @property
+    def encoding(self) -> tiktoken.Encoding:
+        # Loaded lazily: the first load may fetch the BPE file
+        if self._encoding is None:
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+        return self._encoding
+
+    def count_tokens(self, text: str) -> int:
+        # Special-token markers in content are counted as plain text instead of raising
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def merge(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge contiguous chunks of the same document, dropping their overlap.
+
+        Output keeps the relevance order of each span's best chunk.
+        """
+        rank = {id(ctx): idx for idx, ctx in enumerate(contexts)}
+        groups: Dict[Any, List[Dict[str, Any]]] = {}
+        for ctx in contexts:
+            groups.setdefault(ctx.get("document_id") or id(ctx), []).append(ctx)
+
+        spans = []
+        for members in groups.values():
+            members.sort(key=lambda ctx: ctx.get("chunk_index") if ctx.get("chunk_index") is not None else -1)
+            current = None
+            for ctx in members:
+                if current is not None and self._is_adjacent(current, ctx):
+                    current = self._join(current, ctx)
+                    current["_rank"] = min(current["_rank"], rank[id(ctx)])
+                else:
+                    if current is not None:
+                        spans.append(current)
+                    current = {**ctx, "_rank": rank[id(ctx)]}
+            spans.append(current)
+
+        spans.sort(key=lambda span: span.pop("_rank"))
+        return spans
+
+    @staticmethod
+    def _is_adjacent(left: Dict[str, Any], right: Dict[str, Any]) -> bool:
+        if left.get("chunk_index") is None or right.get("chunk_index") is None:
+            return False
+        return right["chunk_index"] == left["chunk_index"] + 1
+
+    @staticmethod
+    def _join(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+        """Concatenate two adjacent chunks without repeating their shared text."""
+        if left.get("end_char") is not None and right.get("start_char") is not None:
+            overlap = max(0, left["end_char"] - right["start_char"])
+            overlap = min(overlap, len(right["content"]))
+        else:
+            overlap = _text_overlap(left["content"], right["content"])
+
+        separator = "" if overlap else "\n"
+        return {
+            **left,
+            "content": left["content"] + separator + right["content"][overlap:],
+            "chunk_index": right["chunk_index"],
+            "end_char": right.get("end_char"),
+            "similarity": max(left["similarity"], right["similarity"]),
+        }
+
+    def pack(
+        self,
+        contexts: List[Dict[str, Any]],
+        budget_tokens: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Merge contexts and keep as many sources as fit in the token budget.
+
+        A source that does not fit whole is truncated if at least
+        CONTEXT_MIN_SOURCE_TOKENS of it fit; smaller sources further down can
+        still fill the remaining space.
+        """
+        budget = budget_tokens or settings.CONTEXT_TOKEN_BUDGET
+        packed = []
+        used = 0
+
+        for span in self.merge(contexts):
+            idx = len(packed) + 1
+            cost = self.count_tokens(format_source(idx, span))
+            if used + cost <= budget:
+                packed.append(span)
+                used += cost
+                continue
+
+            overhead = self.count_tokens(format_source(idx, {**span, "content": ""}))
+            room = budget - used - overhead
+            if room >= settings.CONTEXT_MIN_SOURCE_TOKENS:
+                tokens = self.encoding.encode(span["content"], disallowed_special=())[:room]
+                packed.append({**span, "content": self.encoding.decode(tokens), "truncated": True})
+                used += overhead + room
+
+        return packed
+
+
+# Singleton instance
+context_packer = ContextPacker()
@@ -11,13 +11,13 @@ class EmbeddingService:
     """Service for generating text embeddings."""
     
     def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = settings.EMBEDDING_MODEL
         self.dimension = 1536  # text-embedding-3-small dimension
     
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for a single text."""
-        response = self.client.embeddings.create(
+        response = await self.client.embeddings.create(
             model=self.model,
             input=text,
         )
@@ -25,7 +25,7 @@ class EmbeddingService:
     
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for multiple texts."""
-        response = self.client.embeddings.create(
+        response = await self.client.embeddings.create(
             model=self.model,
             input=texts,
         )
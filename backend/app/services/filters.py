@@ -0,0 +1,69 @@
+"""Metadata predicates shared by vector and lexical retrieval."""
+import calendar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import Select
+
+from app.models.document import ContentType, Document
+
+
+def to_epoch(value: datetime) -> int:
+    """Seconds since the epoch; naive datetimes are taken as UTC, like the rest of the app."""
+    return calendar.timegm(value.utctimetuple())
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Naive UTC datetime, comparable with the app's naive timestamp columns."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class MetadataFilters(NamedTuple):
+    """Search predicates beyond the practice-area filter.
+
+    Content type and publication date are pushed down into the vector query
+    (vectors carry `content_type` and `published_at_ts` metadata). Author is
+    a case-insensitive substring match, which Chroma cannot evaluate on
+    metadata, so it is applied to vector hits after the query. Lexical search
+    applies every predicate in SQL.
+    """
+    content_types: Optional[List[str]] = None
+    published_from: Optional[datetime] = None
+    published_to: Optional[datetime] = None
+    author: Optional[str] = None
+
+    @property
+    def needs_post_filter(self) -> bool:
+        return bool(self.author)
+
+    def where_clauses(self) -> List[Dict[str, Any]]:
+        """Chroma `where` clauses for the predicates the vector store can evaluate."""
+        clauses: List[Dict[str, Any]] = []
+        if self.content_types:
+            clauses.append({"content_type": {"$in": list(self.content_types)}})
+        if self.published_from:
+            clauses.append({"published_at_ts": {"$gte": to_epoch(self.published_from)}})
+        if self.published_to:
+            clauses.append({"published_at_ts": {"$lte": to_epoch(self.published_to)}})
+        return clauses
+
+    def matches(self, metadata: Dict[str, Any]) -> bool:
+        """Evaluate the post-filter predicates against a vector hit's metadata."""
+        if self.author:
+            return self.author.lower() in (metadata.get("author") or "").lower()
+        return True
+
+    def apply_sql(self, stmt: Select) -> Select:
+        """Add every predicate to a statement that joins Document."""
+        if self.content_types:
+            stmt = stmt.where(Document.content_type.in_([ContentType(ct) for ct in self.content_types]))
+        # published_at is naive UTC; asyncpg rejects comparing it with an aware value
+        if self.published_from:
+            stmt = stmt.where(Document.published_at >= to_naive_utc(self.published_from))
+        if self.published_to:
+            stmt = stmt.where(Document.published_at <= to_naive_utc(self.published_to))
+        if self.author:
+            stmt = stmt.where(Document.author.icontains(self.author, autoescape=True))
+        return stmt
@@ -1,8 +1,10 @@
 """Document ingestion and processing service."""
 import os
+import time
 import uuid
 from datetime import datetime
-from typing import List, Optional, Tuple
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from pypdf import PdfReader
@@ -12,7 +14,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.models.document import ContentType, Document, DocumentChunk
 from app.models.user import PracticeArea
+from app.services.answer_cache import answer_cache
+from app.services.context_packer import context_packer
 from app.services.embeddings import embedding_service
+from app.services.filters import to_epoch
+from app.services.suggest import suggest_index
 from app.services.vector_store import vector_store
 
 
@@ -26,6 +32,9 @@ class IngestionService:
             length_function=len,
             separators=["\n\n", "\n", ". ", " ", ""],
         )
+        # Buffered characters before the streaming chunker re-splits
+        self.stream_window = 8 * 1000
+        self.read_block_size = 64 * 1024
     
     async def extract_text_from_pdf(self, file_path: str) -> str:
         """Extract text content from a PDF file."""
@@ -51,6 +60,37 @@ class IngestionService:
         else:
             raise ValueError(f"Unsupported file type: {ext}")
     
+    def iter_text_from_pdf(self, file_path: str) -> Iterator[str]:
+        """Lazily yield PDF text page by page, joined the same way as extract_text_from_pdf.
+        
+        The reader gets an open file rather than a path: given a path, pypdf
+        reads the whole file into memory first. Parsed page objects are
+        still cached by the reader, so memory grows with page structure,
+        not with file size.
+        """
+        with open(file_path, "rb") as f:
+            reader = PdfReader(f)
+            first = True
+            
+            for page in reader.pages:
+                text = page.extract_text()
+                if text:
+                    yield text if first else "\n\n" + text
+                    first = False
+    
+    def iter_text_from_file(self, file_path: str) -> Iterator[str]:
+        """Lazily yield text pieces from a file without loading it whole."""
+        ext = os.path.splitext(file_path)[1].lower()
+        
+        if ext == ".pdf":
+            yield from self.iter_text_from_pdf(file_path)
+        elif ext in [".txt", ".md"]:
+            with open(file_path, "r", encoding="utf-8") as f:
+                while block := f.read(self.read_block_size):
+                    yield block
+        else:
+            raise ValueError(f"Unsupported file type: {ext}")
+    
     def chunk_text(self, text: str) -> List[Tuple[str, int, int]]:
         """Split text into chunks with character positions."""
         chunks = self.text_splitter.split_text(text)
@@ -70,6 +110,226 @@ class IngestionService:
         
         return result
     
+    def iter_chunks(self, pieces: Iterable[str]) -> Iterator[Tuple[str, int, int]]:
+        """Chunk a stream of text pieces incrementally with absolute character positions.
+        
+        The last chunk of each window is held back and re-split with the next
+        piece, so chunk overlap is carried across piece boundaries.
+        """
+        buffer = ""
+        offset = 0
+        
+        for piece in pieces:
+            buffer += piece
+            if len(buffer) < self.stream_window:
+                continue
+            
+            chunks = self.chunk_text(buffer)
+            for chunk, start_char, end_char in chunks[:-1]:
+                yield chunk, offset + start_char, offset + end_char
+            
+            carry_from = chunks[-1][1]
+            buffer = buffer[carry_from:]
+            offset += carry_from
+        
+        if buffer.strip():
+            for chunk, start_char, end_char in self.chunk_text(buffer):
+                yield chunk, offset + start_char, offset + end_char
+    
+    @staticmethod
+    def _filter_metadata(document: Document) -> Dict[str, Any]:
+        """Optional vector metadata used by search filters (Chroma rejects None values)."""
+        metadata: Dict[str, Any] = {}
+        if document.published_at:
+            metadata["published_at_ts"] = to_epoch(document.published_at)
+        if document.author:
+            metadata["author"] = document.author
+        return metadata
+    
+    @classmethod
+    def vector_metadata(
+        cls,
+        document: Document,
+        practice_area: PracticeArea,
+        chunk_index: int,
+        start_char: Optional[int],
+        end_char: Optional[int],
+    ) -> Dict[str, Any]:
+        """Vector store metadata for one chunk of a document.
+
+        Offsets are left out when unknown rather than stored as 0, since
+        Chroma rejects None values.
+        """
+        metadata: Dict[str, Any] = {
+            "document_id": str(document.id),
+            "chunk_index": chunk_index,
+            "practice_area_id": practice_area.id,
+            "practice_area_name": practice_area.name,
+            "title": document.title,
+            "content_type": document.content_type.value,
+            "ingested_at": int(time.time()),
+            **cls._filter_metadata(document),
+        }
+        if start_char is not None:
+            metadata["start_char"] = start_char
+        if end_char is not None:
+            metadata["end_char"] = end_char
+        return metadata
+    
+    @staticmethod
+    def _tally(pieces: Iterable[str], totals: Dict[str, int]) -> Iterator[str]:
+        """Pass text pieces through, adding their characters and tokens to `totals`."""
+        for piece in pieces:
+            totals["chars"] += len(piece)
+            totals["tokens"] += context_packer.count_tokens(piece)
+            yield piece
+    
+    @staticmethod
+    def _set_totals(document: Document, text: str, chunk_count: int) -> None:
+        """Record a document's content totals; committed with its chunks."""
+        document.chunk_count = chunk_count
+        document.char_count = len(text)
+        document.token_count = context_packer.count_tokens(text)
+    
+    async def _store_chunk_batch(
+        self,
+        db: AsyncSession,
+        document: Document,
+        practice_area: PracticeArea,
+        batch: List[Tuple[str, int, int]],
+        start_index: int,
+    ) -> None:
+        """Embed a batch of chunks and flush it to the database and vector store."""
+        embeddings = await embedding_service.generate_embeddings([chunk[0] for chunk in batch])
+        
+        chunk_records = []
+        vector_ids = []
+        vector_documents = []
+        vector_metadatas = []
+        
+        for idx, (chunk_text, start_char, end_char) in enumerate(batch, start=start_index):
+            vector_id = embedding_service.generate_vector_id(
+                chunk_text, str(document.id), idx
+            )
+            
+            chunk = DocumentChunk(
+                document_id=document.id,
+                content=chunk_text,
+                chunk_index=idx,
+                vector_id=vector_id,
+                start_char=start_char,
+                end_char=end_char,
+                metadata={
+                    "title": document.title,
+                    "practice_area": practice_area.name,
+                },
+            )
+            db.add(chunk)
+            chunk_records.append(chunk)
+            
+            vector_ids.append(vector_id)
+            vector_documents.append(chunk_text)
+            vector_metadatas.append(self.vector_metadata(document, practice_area, idx, start_char, end_char))
+        
+        await db.flush()
+        
+        await vector_store.add_documents(
+            ids=vector_ids,
+            embeddings=embeddings,
+            documents=vector_documents,
+            metadatas=vector_metadatas,
+        )
+        
+        # Flushed rows are not needed again; drop them so the session stays small
+        for chunk in chunk_records:
+            db.expunge(chunk)
+    
+    async def ingest_document_stream(
+        self,
+        db: AsyncSession,
+        file_path: str,
+        title: str,
+        practice_area_id: int,
+        content_type: ContentType = ContentType.ARTICLE,
+        description: Optional[str] = None,
+        author: Optional[str] = None,
+        source_url: Optional[str] = None,
+        metadata: Optional[dict] = None,
+    ) -> Document:
+        """Ingest a large document with bounded memory.
+        
+        Text is extracted lazily, chunked incrementally, and embedded and
+        flushed in batches of INGESTION_BATCH_SIZE chunks. Everything is
+        committed in a single transaction at the end.
+        """
+        result = await db.execute(
+            select(PracticeArea).where(PracticeArea.id == practice_area_id)
+        )
+        practice_area = result.scalar_one_or_none()
+        if not practice_area:
+            raise ValueError(f"Practice area {practice_area_id} not found")
+        
+        pieces = self.iter_text_from_file(file_path)
+        
+        # Read just enough text for the default description
+        head = []
+        head_len = 0
+        for piece in pieces:
+            head.append(piece)
+            head_len += len(piece)
+            if head_len >= 500:
+                break
+        preview = "".join(head)[:500]
+        
+        document = Document(
+            title=title,
+            description=description or preview,
+            content_type=content_type,
+            practice_area_id=practice_area_id,
+            file_path=file_path,
+            file_name=os.path.basename(file_path),
+            file_size_bytes=os.path.getsize(file_path),
+            source_url=source_url,
+            author=author,
+            published_at=datetime.utcnow(),
+            metadata=metadata or {},
+        )
+        
+        db.add(document)
+        await db.flush()
+        
+        document_id = document.id  # Still readable after a rollback expires the instance
+        totals = {"chars": 0, "tokens": 0}
+        batch = []
+        next_index = 0
+        try:
+            for chunk in self.iter_chunks(self._tally(chain(head, pieces), totals)):
+                batch.append(chunk)
+                if len(batch) >= settings.INGESTION_BATCH_SIZE:
+                    await self._store_chunk_batch(db, document, practice_area, batch, next_index)
+                    next_index += len(batch)
+                    batch = []
+            
+            if batch:
+                await self._store_chunk_batch(db, document, practice_area, batch, next_index)
+                next_index += len(batch)
+            
+            document.chunk_count = next_index
+            document.char_count = totals["chars"]
+            document.token_count = totals["tokens"]
+            await answer_cache.bump_generation(db, practice_area_id)
+            await db.commit()
+        except Exception:
+            # Batches already in the vector store would be orphans once the transaction rolls back
+            await db.rollback()
+            await vector_store.delete_by_document_id(str(document_id))
+            raise
+        await db.refresh(document)
+        answer_cache.invalidate_practice_area(practice_area_id)
+        suggest_index.add(document)
+        
+        return document
+    
     async def ingest_document(
         self,
         db: AsyncSession,
@@ -83,6 +343,20 @@ class IngestionService:
         metadata: Optional[dict] = None,
     ) -> Document:
         """Ingest a document: extract text, chunk, embed, and store."""
+        # Large files go through the bounded-memory streaming path
+        threshold = settings.INGESTION_STREAMING_THRESHOLD_MB * 1024 * 1024
+        if os.path.getsize(file_path) >= threshold:
+            return await self.ingest_document_stream(
+                db=db,
+                file_path=file_path,
+                title=title,
+                practice_area_id=practice_area_id,
+                content_type=content_type,
+                description=description,
+                author=author,
+                source_url=source_url,
+                metadata=metadata,
+            )
         
         # Verify practice area exists
         result = await db.execute(
@@ -152,14 +426,7 @@ class IngestionService:
             # Prepare for vector store
             vector_ids.append(vector_id)
             vector_documents.append(chunk_text)
-            vector_metadatas.append({
-                "document_id": str(document.id),
-                "chunk_index": idx,
-                "practice_area_id": practice_area_id,
-                "practice_area_name": practice_area.name,
-                "title": title,
-                "content_type": content_type.value,
-            })
+            vector_metadatas.append(self.vector_metadata(document, practice_area, idx, start_char, end_char))
         
         # Store in vector database
         await vector_store.add_documents(
@@ -169,8 +436,12 @@ class IngestionService:
             metadatas=vector_metadatas,
         )
         
+        self._set_totals(document, full_text, len(chunks))
+        await answer_cache.bump_generation(db, practice_area_id)
         await db.commit()
         await db.refresh(document)
+        answer_cache.invalidate_practice_area(practice_area_id)
+        suggest_index.add(document)
         
         return document
     
@@ -244,14 +515,7 @@ class IngestionService:
             
             vector_ids.append(vector_id)
             vector_documents.append(chunk_text)
-            vector_metadatas.append({
-                "document_id": str(document.id),
-                "chunk_index": idx,
-                "practice_area_id": practice_area_id,
-                "practice_area_name": practice_area.name,
-                "title": title,
-                "content_type": content_type.value,
-            })
+            vector_metadatas.append(self.vector_metadata(document, practice_area, idx, start_char, end_char))
         
         await vector_store.add_documents(
             ids=vector_ids,
@@ -260,15 +524,20 @@ class IngestionService:
             metadatas=vector_metadatas,
         )
         
+        self._set_totals(document, text, len(chunks))
+        await answer_cache.bump_generation(db, practice_area_id)
         await db.commit()
         await db.refresh(document)
+        answer_cache.invalidate_practice_area(practice_area_id)
+        suggest_index.add(document)
         
         return document
     
     async def delete_document(self, db: AsyncSession, document_id: uuid.UUID) -> bool:
         """Delete a document and its chunks from both DB and vector store."""
+        # Row lock until commit: reconciliation must not re-embed chunks whose vectors are going away
         result = await db.execute(
-            select(Document).where(Document.id == document_id)
+            select(Document).where(Document.id == document_id).with_for_update()
         )
         document = result.scalar_one_or_none()
         
@@ -279,8 +548,12 @@ class IngestionService:
         await vector_store.delete_by_document_id(str(document_id))
         
         # Delete from database (cascades to chunks)
+        practice_area_id = document.practice_area_id
         await db.delete(document)
+        await answer_cache.bump_generation(db, practice_area_id)
         await db.commit()
+        answer_cache.invalidate_practice_area(practice_area_id)
+        suggest_index.remove(str(document_id))
         
         return True
 
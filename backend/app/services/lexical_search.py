@@ -0,0 +1,132 @@
+"""Lexical (full-text) retrieval over document chunks using Postgres."""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select, text
+
+from app.core.database import AsyncSessionLocal
+from app.models.document import Document, DocumentChunk
+from app.models.user import PracticeArea
+from app.services.filters import MetadataFilters, to_epoch
+
+
+class LexicalSearchService:
+    """Service for keyword retrieval backed by the document_chunks tsvector GIN index.
+
+    Catches exact terms embeddings tend to blur: vendor names, SKUs, chip
+    model numbers and tickers. Uses its own short-lived session so it can run
+    concurrently with other stages of a request.
+    """
+
+    async def query(
+        self,
+        query: str,
+        n_results: int = 20,
+        practice_area_ids: Optional[List[int]] = None,
+        filters: Optional[MetadataFilters] = None,
+    ) -> Dict[str, Any]:
+        """Return chunk hits ranked by ts_rank_cd, shaped like VectorStore.query."""
+        ts_query = func.websearch_to_tsquery("english", query)
+        rank = func.ts_rank_cd(DocumentChunk.content_tsv, ts_query)
+
+        stmt = (
+            select(
+                DocumentChunk.vector_id,
+                DocumentChunk.content,
+                DocumentChunk.chunk_index,
+                DocumentChunk.start_char,
+                DocumentChunk.end_char,
+                Document.id,
+                Document.title,
+                Document.content_type,
+                Document.author,
+                Document.published_at,
+                Document.practice_area_id,
+                PracticeArea.name,
+                rank.label("rank"),
+            )
+            .join(Document, DocumentChunk.document_id == Document.id)
+            .join(PracticeArea, Document.practice_area_id == PracticeArea.id)
+            .where(DocumentChunk.content_tsv.op("@@")(ts_query))
+            .where(DocumentChunk.vector_id.is_not(None))
+            .order_by(rank.desc())
+            .limit(n_results)
+        )
+        if practice_area_ids:
+            stmt = stmt.where(Document.practice_area_id.in_(practice_area_ids))
+        if filters:
+            stmt = filters.apply_sql(stmt)
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(stmt)).all()
+
+        return {
+            "ids": [row.vector_id for row in rows],
+            "documents": [row.content for row in rows],
+            "metadatas": [self._metadata(row) for row in rows],
+            "scores": [float(row.rank) for row in rows],
+        }
+
+    async def facet_counts(
+        self,
+        query: str,
+        practice_area_ids: Optional[List[int]] = None,
+        filters: Optional[MetadataFilters] = None,
+        timeout_ms: Optional[int] = None,
+    ) -> List[Any]:
+        """Count documents with a chunk matching the query, per practice area and content type.
+
+        Returns rows of (practice_area_id, practice_area_name, content_type,
+        count). `timeout_ms` sets a server-side statement timeout so an
+        abandoned aggregate does not keep running.
+        """
+        ts_query = func.websearch_to_tsquery("english", query)
+        matching = (
+            select(DocumentChunk.id)
+            .where(DocumentChunk.document_id == Document.id)
+            .where(DocumentChunk.content_tsv.op("@@")(ts_query))
+            .exists()
+        )
+
+        stmt = (
+            select(
+                Document.practice_area_id,
+                PracticeArea.name,
+                Document.content_type,
+                func.count(Document.id).label("count"),
+            )
+            .join(PracticeArea, Document.practice_area_id == PracticeArea.id)
+            .where(matching)
+            .group_by(Document.practice_area_id, PracticeArea.name, Document.content_type)
+        )
+        if practice_area_ids:
+            stmt = stmt.where(Document.practice_area_id.in_(practice_area_ids))
+        if filters:
+            stmt = filters.apply_sql(stmt)
+
+        async with AsyncSessionLocal() as session:
+            if timeout_ms:
+                await session.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+            return list((await session.execute(stmt)).all())
+
+    @staticmethod
+    def _metadata(row: Any) -> Dict[str, Any]:
+        """Vector-store-shaped metadata for a result row."""
+        metadata = {
+            "document_id": str(row.id),
+            "chunk_index": row.chunk_index,
+            "start_char": row.start_char,
+            "end_char": row.end_char,
+            "practice_area_id": row.practice_area_id,
+            "practice_area_name": row.name,
+            "title": row.title,
+            "content_type": row.content_type.value,
+        }
+        if row.published_at:
+            metadata["published_at_ts"] = to_epoch(row.published_at)
+        if row.author:
+            metadata["author"] = row.author
+        return metadata
+
+
+# Singleton instance
+lexical_search_service = LexicalSearchService()
@@ -0,0 +1,58 @@
+"""Minimal async stage graph for request pipelines."""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+StageFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class Pipeline:
+    """A small dependency graph of async stages.
+
+    Each stage receives the results of the stages it depends on and starts as
+    soon as they finish, so independent stages run concurrently. Stages must
+    be added after their dependencies.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Tuple[StageFn, Tuple[str, ...]]] = {}
+
+    def add(self, name: str, fn: StageFn, depends_on: Iterable[str] = ()) -> "Pipeline":
+        """Register a stage; `fn` is called with {dependency name: result}."""
+        depends_on = tuple(depends_on)
+        unknown = [dep for dep in depends_on if dep not in self._stages]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on unknown stages: {', '.join(unknown)}")
+        self._stages[name] = (fn, depends_on)
+        return self
+
+    async def run(self, deadline_seconds: Optional[float] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Run every stage and return (results, timings in ms).
+
+        Raises asyncio.TimeoutError if the whole graph exceeds the deadline;
+        unfinished stages are cancelled.
+        """
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str) -> Any:
+            fn, depends_on = self._stages[name]
+            inputs = {dep: await tasks[dep] for dep in depends_on}
+            stage_started = time.perf_counter()
+            result = await fn(inputs)
+            timings[f"{name}_ms"] = round((time.perf_counter() - stage_started) * 1000, 2)
+            return result
+
+        for name in self._stages:
+            tasks[name] = asyncio.create_task(run_stage(name))
+
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks.values()), timeout=deadline_seconds)
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+
+        timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return {name: task.result() for name, task in tasks.items()}, timings
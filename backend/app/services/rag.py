@@ -1,74 +1,39 @@
 """RAG (Retrieval-Augmented Generation) service."""
-from typing import AsyncGenerator, List, Optional, Dict, Any
-from uuid import UUID
+import asyncio
+import logging
+from typing import AsyncGenerator, List, Optional, Dict, Any, Tuple
+from uuid import UUID, uuid4
 
 import anthropic
-from sqlalchemy import select
+import httpx
+from sqlalchemy import select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.models.document import Document, DocumentChunk
 from app.models.conversation import Conversation, Message, MessageRole
 from app.models.user import User
+from app.services.admission import AdmissionController, Priority, admission_controller
+from app.services.answer_cache import answer_cache
+from app.services.context_packer import context_packer, format_source
 from app.services.embeddings import embedding_service
-from app.services.vector_store import vector_store
+from app.services.pipeline import Pipeline
+from app.services.retrieval import HybridRetriever, hybrid_retriever
+from app.services.routing import ModelRouter, model_router
+from app.utils.pagination import next_keyset_cursor, seek_newest_first
 
+logger = logging.getLogger(__name__)
 
-class RAGService:
-    """Service for retrieval-augmented generation with Claude."""
-    
-    def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        self.model = settings.CLAUDE_MODEL
-    
-    async def retrieve_context(
-        self,
-        query: str,
-        practice_area_ids: List[int],
-        n_results: int = 5,
-    ) -> List[Dict[str, Any]]:
-        """Retrieve relevant document chunks for a query."""
-        # Generate query embedding
-        query_embedding = await embedding_service.generate_embedding(query)
-        
-        # Search vector store
-        results = await vector_store.query(
-            query_embedding=query_embedding,
-            n_results=n_results,
-            practice_area_ids=practice_area_ids if practice_area_ids else None,
-        )
-        
-        # Format results
-        contexts = []
-        for idx, doc in enumerate(results["documents"]):
-            metadata = results["metadatas"][idx] if results["metadatas"] else {}
-            contexts.append({
-                "content": doc,
-                "document_id": metadata.get("document_id"),
-                "title": metadata.get("title", "Unknown"),
-                "practice_area": metadata.get("practice_area_name", "Unknown"),
-                "content_type": metadata.get("content_type", "article"),
-                "similarity": 1 - results["distances"][idx] if results["distances"] else 0,
-            })
-        
-        return contexts
-    
-    def _build_system_prompt(self, contexts: List[Dict[str, Any]]) -> str:
-        """Build the system prompt with retrieved context."""
-        context_text = ""
-        for idx, ctx in enumerate(contexts, 1):
-            context_text += f"""
-[Source {idx}]
-Title: {ctx['title']}
-Practice Area: {ctx['practice_area']}
-Content Type: {ctx['content_type']}
----
-{ctx['content']}
----
+# Per-message cap when feeding turns to the summarizer
+SUMMARY_MESSAGE_CHARS = 4000
 
-"""
-        
-        system_prompt = f"""You are an AI research assistant for The Futurum Group—a modern alternative to legacy analyst firms like Gartner or Forrester. You provide real-time, AI-driven insights rather than static annual reports.
+SUMMARY_PROMPT = """You maintain a running summary of a research conversation between a client and The Futurum Group's AI research assistant. Merge the new turns into the current summary. Keep the client's goals, the companies, markets and figures discussed, conclusions reached and open questions. Write compact prose under 300 words and return only the updated summary."""
+
+# Static persona and guidelines. Kept byte-identical across requests so the
+# provider can serve it, and the history after it, from the prompt cache.
+# Per-turn research content travels with the latest user message instead.
+SYSTEM_PREAMBLE = """You are an AI research assistant for The Futurum Group—a modern alternative to legacy analyst firms like Gartner or Forrester. You provide real-time, AI-driven insights rather than static annual reports.
 
 About The Futurum Group:
 - Specializes in high-growth sectors: AI, cloud computing, cybersecurity, semiconductors, and enterprise software
@@ -80,10 +45,6 @@ About The Futurum Group:
 The Human + Machine Approach:
 You represent Futurum's "analyst-grounded AI" philosophy—AI-generated insights validated and contextualized by expert analysts. You cut through the noise to deliver actionable intelligence, not automated noise.
 
-You have access to the following research content relevant to the user's question:
-
-{context_text}
-
 Guidelines:
 1. Provide REAL-TIME, ACTIONABLE insights—not generic summaries. Help users make decisions, not just understand topics.
 2. When citing information, reference the source by title and practice area
@@ -96,112 +57,556 @@ Guidelines:
 
 Remember: Customers choose Futurum over legacy analysts because they want forward-looking, predictive insights that help them act NOW—not retrospective documentation of what already happened.
 
-Always cite your sources when providing specific facts, data points, or strategic insights."""
+Always cite your sources when providing specific facts, data points, or strategic insights. The research content available for the current question is included with the user's latest message."""
+
+# Shortest prefix the provider will cache, by model family; shorter breakpoints are ignored
+PROMPT_CACHE_MIN_TOKENS = {"haiku": 2048}
+DEFAULT_PROMPT_CACHE_MIN_TOKENS = 1024
+
+
+def _cache_min_tokens(model: str) -> int:
+    for family, tokens in PROMPT_CACHE_MIN_TOKENS.items():
+        if family in model:
+            return tokens
+    return DEFAULT_PROMPT_CACHE_MIN_TOKENS
 
-        return system_prompt
+
+class RAGService:
+    """Service for retrieval-augmented generation with Claude."""
     
-    async def generate_response(
+    def __init__(
+        self,
+        retriever: Optional[HybridRetriever] = None,
+        admission: Optional[AdmissionController] = None,
+        router: Optional[ModelRouter] = None,
+    ):
+        self.retriever = retriever or hybrid_retriever
+        # One pooled async client per worker, shared by every request
+        self.client = anthropic.AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            max_retries=settings.LLM_MAX_RETRIES,
+            timeout=httpx.Timeout(
+                settings.LLM_READ_TIMEOUT_SECONDS,
+                connect=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+            ),
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            ),
+        )
+        self.router = router or model_router
+        self.admission = admission or admission_controller
+        self._background_tasks: set = set()
+    
+    async def close(self) -> None:
+        """Close the pooled LLM client."""
+        await self.client.close()
+    
+    async def retrieve_context(
+        self,
+        query: str,
+        practice_area_ids: List[int],
+        n_results: int = 5,
+        query_embedding: Optional[List[float]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+        """Retrieve relevant document chunks for a query, with per-stage timings."""
+        retrieval = await self.retriever.retrieve(
+            query=query,
+            n_results=n_results,
+            practice_area_ids=practice_area_ids,
+            query_embedding=query_embedding,
+        )
+        
+        # Format results
+        contexts = []
+        for hit in retrieval["hits"]:
+            metadata = hit["metadata"]
+            contexts.append({
+                "content": hit["content"],
+                "document_id": metadata.get("document_id"),
+                "chunk_index": metadata.get("chunk_index"),
+                "start_char": metadata.get("start_char"),
+                "end_char": metadata.get("end_char"),
+                "title": metadata.get("title", "Unknown"),
+                "practice_area": metadata.get("practice_area_name", "Unknown"),
+                "content_type": metadata.get("content_type", "article"),
+                "similarity": hit["similarity"],
+            })
+        
+        return contexts, retrieval["timings"]
+    
+    def _build_system_prompt(self, summary: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Build the system prompt as content blocks: preamble, then the rolling summary."""
+        blocks = [{"type": "text", "text": SYSTEM_PREAMBLE}]
+        if summary:
+            blocks.append({
+                "type": "text",
+                "text": f"Summary of the earlier part of this conversation:\n\n{summary}",
+            })
+        return blocks
+    
+    @staticmethod
+    def _usage_to_dict(usage: Any) -> Dict[str, int]:
+        """Convert an Anthropic usage object into message metadata, including cache counts."""
+        return {
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+            "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        }
+    
+    @staticmethod
+    def _after_summary(query, conversation: Conversation):
+        """Restrict a message query to messages the rolling summary does not cover yet."""
+        if conversation.summary_through is None:
+            return query
+        if conversation.summary_through_id is None:
+            # Summaries folded before the message ID was recorded
+            return query.where(Message.created_at > conversation.summary_through)
+        return query.where(
+            tuple_(Message.created_at, Message.id)
+            > tuple_(conversation.summary_through, conversation.summary_through_id)
+        )
+    
+    async def load_history(
+        self,
+        db: AsyncSession,
+        conversation: Conversation,
+    ) -> List[Dict[str, str]]:
+        """Load every message the summary does not cover yet, oldest first.
+
+        The summary only folds once SUMMARY_FOLD_BATCH messages have left the
+        HISTORY_MAX_MESSAGES window, so the window stretches until then
+        instead of dropping messages neither side covers. The cap only bites
+        if summarizing falls behind or is disabled.
+        """
+        limit = settings.HISTORY_MAX_MESSAGES
+        if settings.SUMMARY_ENABLED:
+            limit += 2 * settings.SUMMARY_FOLD_BATCH
+        query = (
+            select(Message.role, Message.content)
+            .where(Message.conversation_id == conversation.id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(limit)
+        )
+        result = await db.execute(self._after_summary(query, conversation))
+        rows = list(reversed(result.all()))
+        
+        # Claude expects the conversation to open with a user turn
+        while rows and rows[0].role != MessageRole.USER:
+            rows.pop(0)
+        
+        return [{"role": row.role.value, "content": row.content} for row in rows]
+    
+    async def update_summary(self, conversation_id: UUID) -> None:
+        """Fold messages that have left the history window into the rolling summary."""
+        async with AsyncSessionLocal() as db:
+            conversation = await db.get(Conversation, conversation_id)
+            if conversation is None:
+                return
+            
+            pending = (
+                conversation.message_count
+                - conversation.summary_message_count
+                - settings.HISTORY_MAX_MESSAGES
+            )
+            if pending < settings.SUMMARY_FOLD_BATCH:
+                return
+            
+            query = (
+                select(Message.id, Message.role, Message.content, Message.created_at)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at, Message.id)
+                .limit(pending)
+            )
+            rows = (await db.execute(self._after_summary(query, conversation))).all()
+            if not rows:
+                return
+            
+            transcript = "\n\n".join(
+                f"{row.role.value.upper()}: {row.content[:SUMMARY_MESSAGE_CHARS]}" for row in rows
+            )
+            async with self.admission.slot(Priority.BACKGROUND):
+                response = await self.client.messages.create(
+                    model=settings.SUMMARY_MODEL,
+                    max_tokens=settings.SUMMARY_MAX_TOKENS,
+                    system=SUMMARY_PROMPT,
+                    messages=[{
+                        "role": "user",
+                        "content": f"Current summary:\n{conversation.summary or '(none)'}\n\nNew turns:\n{transcript}",
+                    }],
+                )
+            
+            # Only apply if no other worker folded these messages in the meantime
+            await db.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .where(Conversation.summary_message_count == conversation.summary_message_count)
+                .values(
+                    summary=response.content[0].text,
+                    summary_message_count=conversation.summary_message_count + len(rows),
+                    summary_through=rows[-1].created_at,
+                    summary_through_id=rows[-1].id,
+                    updated_at=Conversation.updated_at,
+                )
+            )
+            await db.commit()
+    
+    async def _update_summary_safely(self, conversation_id: UUID) -> None:
+        try:
+            await self.update_summary(conversation_id)
+        except Exception:
+            logger.exception("Failed to update summary for conversation %s", conversation_id)
+    
+    def _spawn(self, coro) -> None:
+        """Run a coroutine in the background, keeping a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def prepare_turn(
         self,
         query: str,
         user: User,
-        conversation: Optional[Conversation] = None,
-        db: Optional[AsyncSession] = None,
+        db: AsyncSession,
+        conversation_id: Optional[UUID] = None,
+        mode: str = "auto",
     ) -> Dict[str, Any]:
-        """Generate a response to a user query using RAG."""
-        # Get user's practice area IDs
+        """Run the pre-generation stages of a chat turn as a concurrent stage graph.
+        
+        Conversation lookup, query embedding, retrieval and history loading
+        start as soon as their inputs are ready, and the whole graph is bounded
+        by CHAT_PREPARE_DEADLINE_SECONDS. With the answer cache on, retrieval
+        waits for the cache lookup and is skipped on a hit. Retrieval opens its
+        own sessions, so `db` is only used by the conversation and history
+        stages, which run one after the other. A new conversation is only
+        written once every stage has succeeded, so a failed or timed-out turn
+        leaves nothing behind.
+        
+        Raises LookupError if `conversation_id` does not belong to the user and
+        asyncio.TimeoutError if the deadline passes.
+        """
         practice_area_ids = [pa.id for pa in user.practice_areas]
+        use_answer_cache = answer_cache.enabled
         
-        # Retrieve relevant context
-        contexts = await self.retrieve_context(
-            query=query,
-            practice_area_ids=practice_area_ids,
-            n_results=5,
-        )
+        async def conversation_stage(_: Dict[str, Any]) -> Conversation:
+            if conversation_id:
+                result = await db.execute(
+                    select(Conversation)
+                    .where(Conversation.id == conversation_id)
+                    .where(Conversation.user_id == user.id)
+                )
+                conversation = result.scalar_one_or_none()
+                if not conversation:
+                    raise LookupError("Conversation not found")
+                return conversation
+            
+            return Conversation(
+                id=uuid4(),
+                user_id=user.id,
+                title=query[:50] + "..." if len(query) > 50 else query,
+            )
+        
+        async def history_stage(inputs: Dict[str, Any]) -> List[Dict[str, str]]:
+            if conversation_id is None:
+                return []
+            return await self.load_history(db, inputs["conversation"])
+        
+        async def embedding_stage(_: Dict[str, Any]) -> List[float]:
+            return await embedding_service.generate_embedding(query)
         
-        # Build conversation history if available
-        messages = []
-        if conversation and conversation.messages:
-            for msg in conversation.messages[-10:]:  # Last 10 messages
-                messages.append({
-                    "role": msg.role.value,
-                    "content": msg.content,
-                })
+        async def retrieval_stage(inputs: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+            if inputs.get("answer_cache"):
+                # The cached answer carries its own sources
+                return [], {}
+            return await self.retrieve_context(
+                query=query,
+                practice_area_ids=practice_area_ids,
+                n_results=settings.RAG_CONTEXT_CHUNKS,
+                query_embedding=inputs.get("embedding"),
+            )
         
-        # Add current query
+        async def generation_stage(_: Dict[str, Any]) -> Any:
+            return await answer_cache.generation(practice_area_ids)
+        
+        async def answer_cache_stage(inputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            # Only first-turn questions are answered from the cache
+            if inputs["conversation"].message_count:
+                return None
+            return answer_cache.lookup(inputs["embedding"], inputs["cache_generation"])
+        
+        pipeline = Pipeline()
+        pipeline.add("conversation", conversation_stage)
+        pipeline.add("history", history_stage, depends_on=["conversation"])
+        if use_answer_cache:
+            # The cache needs the embedding up front, so retrieval reuses it
+            pipeline.add("embedding", embedding_stage)
+            # Read before retrieval so an ingestion during this turn invalidates its answer
+            pipeline.add("cache_generation", generation_stage)
+            pipeline.add(
+                "answer_cache", answer_cache_stage, depends_on=["embedding", "conversation", "cache_generation"]
+            )
+            pipeline.add("retrieval", retrieval_stage, depends_on=["embedding", "answer_cache"])
+        else:
+            pipeline.add("retrieval", retrieval_stage)
+        
+        results, pipeline_timings = await pipeline.run(settings.CHAT_PREPARE_DEADLINE_SECONDS)
+        contexts, retrieval_timings = results["retrieval"]
+        history = results["history"]
+        conversation = results["conversation"]
+        first_turn = not conversation.message_count
+        
+        if conversation_id is None:
+            db.add(conversation)
+            await db.commit()
+            await db.refresh(conversation)
+        
+        # Merge neighbouring chunks and fit sources into the token budget
+        contexts = context_packer.pack(contexts)
+        
+        return {
+            "conversation": conversation,
+            "history": history,
+            "contexts": contexts,
+            "route": self.router.route(query, contexts, conversation.message_count or 0, mode),
+            "cached": results.get("answer_cache"),
+            "query_embedding": results.get("embedding"),
+            "cache_generation": results["cache_generation"] if use_answer_cache and first_turn else None,
+            "timings": {"pipeline": pipeline_timings, "retrieval": retrieval_timings},
+        }
+    
+    def _build_request(
+        self,
+        query: str,
+        turn: Dict[str, Any],
+        model: str,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Build the (system, messages) pair for a prepared turn.
+        
+        System prompt and history form a prefix that only grows between
+        summary folds, so it is marked for prompt caching; the retrieved
+        sources change every turn and go in the final user message. Breakpoints
+        are only set where the prefix reaches the model's cache minimum.
+        """
+        conversation = turn["conversation"]
+        system_prompt = self._build_system_prompt(conversation.summary)
+        messages: List[Dict[str, Any]] = [dict(message) for message in turn["history"]]
+        
+        context_text = "".join(format_source(idx, ctx) for idx, ctx in enumerate(turn["contexts"], 1))
         messages.append({
             "role": "user",
-            "content": query,
+            "content": [
+                {
+                    "type": "text",
+                    "text": f"Research content relevant to my question:\n\n{context_text or '(none found)'}",
+                },
+                {"type": "text", "text": query},
+            ],
         })
         
-        # Build system prompt with context
-        system_prompt = self._build_system_prompt(contexts)
+        if settings.PROMPT_CACHE_ENABLED:
+            min_tokens = _cache_min_tokens(model)
+            system_tokens = sum(context_packer.count_tokens(block["text"]) for block in system_prompt)
+            prefix_tokens = system_tokens + sum(
+                context_packer.count_tokens(message["content"]) for message in turn["history"]
+            )
+            if system_tokens >= min_tokens:
+                system_prompt[-1]["cache_control"] = {"type": "ephemeral"}
+            if len(messages) > 1 and prefix_tokens >= min_tokens:
+                last = messages[-2]
+                last["content"] = [
+                    {"type": "text", "text": last["content"], "cache_control": {"type": "ephemeral"}},
+                ]
+            if prefix_tokens < min_tokens:
+                logger.debug(
+                    "Prompt prefix of ~%d tokens is under the %d-token cache minimum for %s; not cached",
+                    prefix_tokens,
+                    min_tokens,
+                    model,
+                )
+        
+        return system_prompt, messages
+    
+    async def generate_response(
+        self,
+        query: str,
+        turn: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Generate a response for a turn prepared with prepare_turn."""
+        conversation = turn["conversation"]
+        
+        # First-turn questions can be answered from the semantic answer cache
+        if turn["cached"]:
+            return {
+                **turn["cached"],
+                "conversation": conversation,
+                "usage": {"input_tokens": 0, "output_tokens": 0},
+                "metadata": {"answer_cache_hit": True, "timings": turn["timings"]},
+            }
+        
+        contexts = turn["contexts"]
+        route = turn["route"]
         
         # Generate response with Claude
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=4096,
-            system=system_prompt,
-            messages=messages,
-        )
+        system_prompt, messages = self._build_request(query, turn, route.model)
+        
+        async with self.admission.slot(Priority.INTERACTIVE):
+            response = await self.client.messages.create(
+                model=route.model,
+                max_tokens=route.max_tokens,
+                system=system_prompt,
+                messages=messages,
+            )
         
         assistant_message = response.content[0].text
         
         # Extract cited document IDs
         cited_documents = [ctx["document_id"] for ctx in contexts if ctx["document_id"]]
         
-        return {
+        usage = self._usage_to_dict(response.usage)
+        result = {
             "response": assistant_message,
+            "conversation": conversation,
             "sources": contexts,
             "citations": cited_documents,
-            "usage": {
-                "input_tokens": response.usage.input_tokens,
-                "output_tokens": response.usage.output_tokens,
-            },
+            "usage": usage,
+            "metadata": {**usage, "route": route.to_metadata(), "timings": turn["timings"]},
         }
+        
+        if turn["cache_generation"] is not None:
+            answer_cache.store(
+                turn["query_embedding"],
+                turn["cache_generation"],
+                {"response": assistant_message, "sources": contexts, "citations": cited_documents},
+            )
+        
+        return result
     
     async def generate_response_stream(
         self,
         query: str,
-        user: User,
-        conversation: Optional[Conversation] = None,
-    ) -> AsyncGenerator[str, None]:
-        """Generate a streaming response to a user query."""
-        # Get user's practice area IDs
-        practice_area_ids = [pa.id for pa in user.practice_areas]
+        turn: Dict[str, Any],
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a turn prepared with prepare_turn as typed events.
         
-        # Retrieve relevant context
-        contexts = await self.retrieve_context(
-            query=query,
-            practice_area_ids=practice_area_ids,
-            n_results=5,
-        )
+        Yields {"type": "input_usage", "usage": ...} as soon as the provider
+        reports input tokens, {"type": "delta", "text": ...} per token, then a
+        final {"type": "usage", "usage": ...}. The turn is saved in the
+        background on its own session once generation finishes.
+        """
+        conversation = turn["conversation"]
         
-        # Build conversation history
-        messages = []
-        if conversation and conversation.messages:
-            for msg in conversation.messages[-10:]:
-                messages.append({
-                    "role": msg.role.value,
-                    "content": msg.content,
-                })
+        if turn["cached"]:
+            assistant_message = turn["cached"]["response"]
+            cited_documents = turn["cached"]["citations"]
+            usage = {"input_tokens": 0, "output_tokens": 0}
+            metadata = {"answer_cache_hit": True, "timings": turn["timings"]}
+            yield {"type": "delta", "text": assistant_message}
+        else:
+            contexts = turn["contexts"]
+            cited_documents = [ctx["document_id"] for ctx in contexts if ctx["document_id"]]
+            route = turn["route"]
+            system_prompt, messages = self._build_request(query, turn, route.model)
+            parts: List[str] = []
+            start_usage = None
+            completed = False
+            
+            # Stream response from Claude; the slot is held for the life of the stream.
+            # If the client disconnects, this generator is closed or cancelled at a
+            # yield or await, and leaving the context managers aborts the upstream
+            # request and frees the slot.
+            try:
+                async with self.admission.slot(Priority.INTERACTIVE):
+                    async with self.client.messages.stream(
+                        model=route.model,
+                        max_tokens=route.max_tokens,
+                        system=system_prompt,
+                        messages=messages,
+                    ) as stream:
+                        async for event in stream:
+                            if event.type == "message_start":
+                                start_usage = event.message.usage
+                                # Lets callers charge input tokens even if the stream ends early
+                                yield {"type": "input_usage", "usage": self._usage_to_dict(start_usage)}
+                            elif event.type == "text":
+                                parts.append(event.text)
+                                yield {"type": "delta", "text": event.text}
+                        final_message = await stream.get_final_message()
+                completed = True
+            finally:
+                if not completed and parts:
+                    self._record_incomplete_turn(
+                        conversation, query, "".join(parts), cited_documents, start_usage,
+                        {"route": route.to_metadata(), "timings": turn["timings"]},
+                    )
+            
+            assistant_message = "".join(parts)
+            usage = self._usage_to_dict(final_message.usage)
+            metadata = {**usage, "route": route.to_metadata(), "timings": turn["timings"]}
+            
+            if turn["cache_generation"] is not None:
+                answer_cache.store(
+                    turn["query_embedding"],
+                    turn["cache_generation"],
+                    {"response": assistant_message, "sources": contexts, "citations": cited_documents},
+                )
         
-        messages.append({
-            "role": "user",
-            "content": query,
-        })
+        # Spawned before the last event so the turn is saved even if the client leaves now
+        self._spawn(self._save_turn_in_background(
+            conversation, query, assistant_message, cited_documents, metadata,
+        ))
+        yield {"type": "usage", "usage": usage}
+    
+    def _record_incomplete_turn(
+        self,
+        conversation: Conversation,
+        user_message: str,
+        partial_response: str,
+        citations: List[str],
+        start_usage: Any,
+        extra_metadata: Dict[str, Any],
+    ) -> None:
+        """Save the partial answer of a stream that ended early, e.g. on client disconnect.
         
-        # Build system prompt
-        system_prompt = self._build_system_prompt(contexts)
-        
-        # Stream response from Claude
-        with self.client.messages.stream(
-            model=self.model,
-            max_tokens=4096,
-            system=system_prompt,
-            messages=messages,
-        ) as stream:
-            for text in stream.text_stream:
-                yield text
+        Output usage only arrives with the final message, so output tokens are
+        estimated from the partial text. Runs synchronously: the caller may be
+        mid-cancellation and cannot await.
+        """
+        usage = self._usage_to_dict(start_usage) if start_usage is not None else {"input_tokens": 0}
+        usage["output_tokens"] = context_packer.count_tokens(partial_response)
+        metadata = {**usage, "incomplete": True, "output_tokens_estimated": True, **extra_metadata}
+        logger.info(
+            "Stream for conversation %s ended early after ~%d output tokens",
+            conversation.id,
+            usage["output_tokens"],
+        )
+        self._spawn(self._save_turn_in_background(
+            conversation, user_message, partial_response, citations, metadata,
+        ))
+    
+    async def _save_turn_in_background(
+        self,
+        conversation: Conversation,
+        user_message: str,
+        assistant_response: str,
+        citations: List[str],
+        metadata: Dict[str, Any],
+    ) -> None:
+        """Save a streamed turn on a fresh session; the request session is gone by now."""
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.save_conversation_turn(
+                    db=db,
+                    conversation=conversation,
+                    user_message=user_message,
+                    assistant_response=assistant_response,
+                    citations=citations,
+                    metadata=metadata,
+                )
+        except Exception:
+            logger.exception("Failed to save streamed turn for conversation %s", conversation.id)
     
     async def save_conversation_turn(
         self,
@@ -233,8 +638,16 @@ Always cite your sources when providing specific facts, data points, or strategi
         )
         db.add(assistant_msg)
         
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation.id)
+            .values(message_count=Conversation.message_count + 2)
+        )
         await db.commit()
         
+        if settings.SUMMARY_ENABLED:
+            self._spawn(self._update_summary_safely(conversation.id))
+        
         return user_msg, assistant_msg
     
     async def create_conversation(
@@ -259,15 +672,31 @@ Always cite your sources when providing specific facts, data points, or strategi
         db: AsyncSession,
         user_id: UUID,
         limit: int = 20,
-    ) -> List[Conversation]:
-        """Get user's recent conversations."""
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Conversation], Optional[str]]:
+        """Get a page of the user's conversations, most recently updated first.
+        
+        Returns the conversations and a cursor for the next page, or None on
+        the last page. Raises ValueError on a malformed cursor.
+        
+        The cursor is on updated_at, which a new message moves forward. A
+        conversation updated while a client pages through the list jumps to
+        the front: it is never repeated, but if the client had not reached it
+        yet it is missing from that pass and shows up first on a refresh.
+        Summary folds keep updated_at unchanged, so only user activity moves
+        conversations.
+        """
         result = await db.execute(
-            select(Conversation)
-            .where(Conversation.user_id == user_id)
-            .order_by(Conversation.updated_at.desc())
-            .limit(limit)
+            seek_newest_first(
+                select(Conversation).where(Conversation.user_id == user_id),
+                Conversation.updated_at,
+                Conversation.id,
+                cursor,
+                limit,
+            )
         )
-        return list(result.scalars().all())
+        conversations = list(result.scalars().all())
+        return conversations[:limit], next_keyset_cursor(conversations, limit, "updated_at")
 
 
 # Singleton instance
@@ -0,0 +1,310 @@
+"""Vector store <-> database reconciliation service."""
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.document import Document, DocumentChunk
+from app.models.user import PracticeArea
+from app.services.embeddings import embedding_service
+from app.services.ingestion import ingestion_service
+from app.services.vector_store import vector_store
+from app.utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+# Number of offending IDs echoed back in a report
+REPORT_SAMPLE_SIZE = 20
+
+# Finished jobs kept for status polling
+JOB_HISTORY_SIZE = 20
+
+# Postgres advisory lock held by whichever worker is reconciling
+RECONCILE_LOCK_KEY = 0x7265636F6E63  # "reconc"
+
+
+class ReconciliationService:
+    """Service for detecting and repairing drift between chunk rows and vectors.
+
+    Both sides are streamed in pages and compared through Bloom filters, so
+    memory stays bounded regardless of corpus size. Bloom filters have no
+    false negatives: every reported item is real drift, while a small
+    fraction (RECONCILE_BLOOM_ERROR_RATE) may go unnoticed until a later run.
+    """
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._background_tasks: set = set()
+
+    async def _iter_chunk_pages(
+        self,
+        db: AsyncSession,
+        page_size: int,
+    ) -> AsyncIterator[List[Tuple[uuid.UUID, Optional[str], datetime]]]:
+        """Yield pages of (chunk id, vector id, created_at) using keyset pagination."""
+        last_id = None
+        while True:
+            query = (
+                select(DocumentChunk.id, DocumentChunk.vector_id, DocumentChunk.created_at)
+                .order_by(DocumentChunk.id)
+                .limit(page_size)
+            )
+            if last_id is not None:
+                query = query.where(DocumentChunk.id > last_id)
+
+            rows = (await db.execute(query)).all()
+            if not rows:
+                break
+            yield rows
+            last_id = rows[-1][0]
+
+    async def reconcile(
+        self,
+        db: AsyncSession,
+        repair: bool = False,
+        page_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Compare chunk rows with vector store contents and optionally repair drift."""
+        started = time.perf_counter()
+        page_size = page_size or settings.RECONCILE_PAGE_SIZE
+        error_rate = settings.RECONCILE_BLOOM_ERROR_RATE
+
+        chunk_total = (await db.execute(select(func.count(DocumentChunk.id)))).scalar() or 0
+        vector_total = (await vector_store.get_collection_stats())["count"]
+
+        # Pass 1: every vector ID known to the database
+        db_filter = BloomFilter(chunk_total, error_rate)
+        async for rows in self._iter_chunk_pages(db, page_size):
+            db_filter.update(vector_id for _, vector_id, _ in rows if vector_id)
+
+        # Pass 2: vectors with no chunk row are orphans
+        vector_filter = BloomFilter(vector_total, error_rate)
+        grace_cutoff = time.time() - settings.RECONCILE_GRACE_MINUTES * 60
+        orphan_ids = []
+        orphan_count = 0
+        vectors_scanned = 0
+
+        async for ids, metadatas in vector_store.iter_pages(page_size):
+            vectors_scanned += len(ids)
+            vector_filter.update(ids)
+            for vector_id, metadata in zip(ids, metadatas):
+                if vector_id in db_filter:
+                    continue
+                # Recent vectors may belong to an ingestion that has not committed yet
+                if (metadata or {}).get("ingested_at", 0) > grace_cutoff:
+                    continue
+                orphan_count += 1
+                if len(orphan_ids) < settings.RECONCILE_MAX_REPAIRS:
+                    orphan_ids.append(vector_id)
+
+        # Pass 3: chunk rows whose vector is absent
+        chunk_grace_cutoff = datetime.utcnow() - timedelta(minutes=settings.RECONCILE_GRACE_MINUTES)
+        missing_chunk_ids = []
+        missing_count = 0
+        chunks_scanned = 0
+
+        async for rows in self._iter_chunk_pages(db, page_size):
+            chunks_scanned += len(rows)
+            for chunk_id, vector_id, created_at in rows:
+                if vector_id and vector_id in vector_filter:
+                    continue
+                # Same grace as pass 2: the vectors may still be on their way
+                if created_at > chunk_grace_cutoff:
+                    continue
+                missing_count += 1
+                if len(missing_chunk_ids) < settings.RECONCILE_MAX_REPAIRS:
+                    missing_chunk_ids.append(chunk_id)
+
+        deleted = 0
+        reembedded = 0
+        if repair:
+            for i in range(0, len(orphan_ids), page_size):
+                batch = orphan_ids[i:i + page_size]
+                await vector_store.delete_ids(batch)
+                deleted += len(batch)
+            reembedded = await self._reembed_chunks(db, missing_chunk_ids)
+
+        report = {
+            "chunks_scanned": chunks_scanned,
+            "vectors_scanned": vectors_scanned,
+            "orphan_vectors": orphan_count,
+            "missing_vectors": missing_count,
+            "orphan_vector_sample": orphan_ids[:REPORT_SAMPLE_SIZE],
+            "missing_vector_chunk_sample": [str(cid) for cid in missing_chunk_ids[:REPORT_SAMPLE_SIZE]],
+            "repaired": repair,
+            "deleted_vectors": deleted,
+            "reembedded_chunks": reembedded,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+        if orphan_count or missing_count:
+            logger.warning("Vector store drift detected: %s", report)
+
+        return report
+
+    async def _reembed_chunks(self, db: AsyncSession, chunk_ids: List[uuid.UUID]) -> int:
+        """Re-embed chunks and write their vectors back to the vector store.
+
+        Each batch locks its documents' rows until it commits.
+        delete_document takes the same lock before removing vectors, so a
+        document being deleted is skipped here (its vectors are already
+        gone, which is what made its chunks look missing), and a deletion
+        that starts mid-batch waits and then removes the repaired vectors
+        too.
+        """
+        batch_size = settings.INGESTION_BATCH_SIZE
+        repaired = 0
+
+        for i in range(0, len(chunk_ids), batch_size):
+            result = await db.execute(
+                select(DocumentChunk, Document, PracticeArea)
+                .join(Document, DocumentChunk.document_id == Document.id)
+                .join(PracticeArea, Document.practice_area_id == PracticeArea.id)
+                .where(DocumentChunk.id.in_(chunk_ids[i:i + batch_size]))
+                .with_for_update(of=Document, skip_locked=True)
+            )
+            rows = result.all()
+            if not rows:
+                await db.commit()
+                continue
+
+            embeddings = await embedding_service.generate_embeddings([chunk.content for chunk, _, _ in rows])
+
+            vector_ids = []
+            vector_metadatas = []
+            for chunk, document, practice_area in rows:
+                if not chunk.vector_id:
+                    chunk.vector_id = embedding_service.generate_vector_id(
+                        chunk.content, str(document.id), chunk.chunk_index
+                    )
+
+                vector_ids.append(chunk.vector_id)
+                # Same metadata as ingestion, so filters see repaired vectors too
+                vector_metadatas.append(ingestion_service.vector_metadata(
+                    document, practice_area, chunk.chunk_index, chunk.start_char, chunk.end_char
+                ))
+
+            await vector_store.add_documents(
+                ids=vector_ids,
+                embeddings=embeddings,
+                documents=[chunk.content for chunk, _, _ in rows],
+                metadatas=vector_metadatas,
+            )
+            await db.commit()
+            repaired += len(rows)
+
+        return repaired
+
+    def start_job(self, repair: bool = False) -> Dict[str, Any]:
+        """Start a reconciliation run in the background and return its job status.
+
+        Only one job runs at a time: while one is running, its status is
+        returned instead of starting another.
+        """
+        for job in self._jobs.values():
+            if job["status"] == "running":
+                return job
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "running",
+            "repair": repair,
+            "started_at": time.time(),
+            "finished_at": None,
+            "report": None,
+            "error": None,
+        }
+        self._jobs[job["job_id"]] = job
+        while len(self._jobs) > JOB_HISTORY_SIZE:
+            self._jobs.popitem(last=False)
+
+        task = asyncio.create_task(self._run_job(job))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a recent job, or None if unknown or expired."""
+        return self._jobs.get(job_id)
+
+    async def _reconcile_exclusively(
+        self,
+        repair: bool,
+        page_size: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Run reconcile under a cluster-wide advisory lock; None if another worker holds it.
+
+        The lock lives on its own session, which keeps one connection for
+        the whole run, since the reconcile session commits between batches.
+        """
+        async with AsyncSessionLocal() as lock_session:
+            acquired = (await lock_session.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": RECONCILE_LOCK_KEY}
+            )).scalar()
+            if not acquired:
+                return None
+            try:
+                async with AsyncSessionLocal() as db:
+                    return await self.reconcile(db, repair=repair, page_size=page_size)
+            finally:
+                await lock_session.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": RECONCILE_LOCK_KEY})
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        try:
+            job["report"] = await self._reconcile_exclusively(job["repair"])
+            if job["report"] is None:
+                raise RuntimeError("Another worker is reconciling; try again later")
+            job["status"] = "completed"
+        except Exception as e:
+            logger.exception("Reconciliation job %s failed", job["job_id"])
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            job["finished_at"] = time.time()
+
+    async def run_periodically(self) -> None:
+        """Run reconciliation every RECONCILE_INTERVAL_MINUTES (scheduled job).
+
+        Every worker schedules it; the advisory lock lets one of them run
+        each tick and the others skip.
+        """
+        interval = settings.RECONCILE_INTERVAL_MINUTES * 60
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                report = await self._reconcile_exclusively(settings.RECONCILE_AUTO_REPAIR)
+                if report is None:
+                    logger.info("Reconciliation skipped: another worker is running it")
+                else:
+                    logger.info("Reconciliation finished: %s", report)
+            except Exception:
+                logger.exception("Reconciliation run failed")
+
+
+# Singleton instance
+reconciliation_service = ReconciliationService()
+
+
+async def _main(repair: bool, page_size: Optional[int]) -> None:
+    report = await reconciliation_service._reconcile_exclusively(repair, page_size)
+    if report is None:
+        raise SystemExit("Another reconciliation is running")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile document chunks with the vector store.")
+    parser.add_argument("--repair", action="store_true", help="Delete orphan vectors and re-embed missing ones")
+    parser.add_argument("--page-size", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(_main(args.repair, args.page_size))
@@ -0,0 +1,38 @@
+"""Optional cross-encoder reranking for retrieved passages."""
+import logging
+from typing import List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """CPU cross-encoder that scores (query, passage) pairs.
+
+    Requires the optional `sentence-transformers` package.
+    """
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    def score(self, query: str, passages: List[str]) -> List[float]:
+        """Score passages against a query (higher is more relevant). Blocking."""
+        return [float(s) for s in self.model.predict([(query, passage) for passage in passages])]
+
+
+def load_reranker() -> Optional[CrossEncoderReranker]:
+    """Load the configured reranker, or None if disabled or unavailable."""
+    if not settings.RERANKER_MODEL:
+        return None
+
+    try:
+        return CrossEncoderReranker(settings.RERANKER_MODEL)
+    except ImportError:
+        logger.warning("RERANKER_MODEL is set but sentence-transformers is not installed; reranking disabled")
+    except Exception:
+        logger.exception("Failed to load reranker %s; reranking disabled", settings.RERANKER_MODEL)
+    return None
@@ -0,0 +1,294 @@
+"""Hybrid retrieval: vector and lexical search fused with reciprocal rank fusion."""
+import asyncio
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embeddings import EmbeddingService, embedding_service
+from app.services.filters import MetadataFilters
+from app.services.lexical_search import LexicalSearchService, lexical_search_service
+from app.services.reranker import CrossEncoderReranker
+from app.services.vector_store import VectorStore, vector_store
+from app.utils.cache import TTLCache
+from app.utils.ranking import min_max_scale, mmr_select, normalize_rows, reciprocal_rank_fusion
+
+logger = logging.getLogger(__name__)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+class HybridRetriever:
+    """Two-stage retriever.
+
+    Stage one over-fetches candidates from vector and lexical search
+    concurrently and fuses them with RRF. Stage two picks the final results
+    with maximal marginal relevance over the candidate embeddings, optionally
+    using cross-encoder scores as relevance when they arrive within budget.
+
+    Hits are dicts with `id` (vector ID), `content`, `metadata`, `similarity`
+    (cosine to the query) and the fused `score`.
+    """
+
+    def __init__(
+        self,
+        embedder: EmbeddingService,
+        store: VectorStore,
+        lexical: Optional[LexicalSearchService] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+    ):
+        self.embedder = embedder
+        self.store = store
+        self.lexical = lexical
+        self.reranker: Optional[CrossEncoderReranker] = None
+        self._rerank_executor: Optional[ThreadPoolExecutor] = None
+        self._rerank_in_flight = 0
+        self.set_reranker(reranker)
+        # Recently observed fraction of vector hits passing post-filters, per filter set
+        self._pass_rates = TTLCache(max_entries=1000, ttl_seconds=3600)
+
+    def set_reranker(self, reranker: Optional[CrossEncoderReranker]) -> None:
+        """Install (or remove) the cross-encoder used in stage two."""
+        self.reranker = reranker
+        if reranker is not None and self._rerank_executor is None:
+            # Scoring threads run on their own small pool, so timed-out jobs cannot pile up in the default one
+            self._rerank_executor = ThreadPoolExecutor(
+                max_workers=settings.RERANK_WORKERS, thread_name_prefix="rerank"
+            )
+
+    async def retrieve(
+        self,
+        query: str,
+        n_results: int = 5,
+        practice_area_ids: Optional[List[int]] = None,
+        query_embedding: Optional[List[float]] = None,
+        filters: Optional[MetadataFilters] = None,
+        diversify: bool = True,
+    ) -> Dict[str, Any]:
+        """Retrieve fused hits for a query, with per-stage timings in milliseconds.
+
+        `diversify=False` skips the MMR stage and returns the top fused hits,
+        for callers that aggregate hits themselves.
+        """
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        n_candidates = max(n_results, settings.HYBRID_CANDIDATES)
+        pa_filter = practice_area_ids or None
+
+        async def vector_stage() -> Dict[str, Any]:
+            nonlocal query_embedding
+            if query_embedding is None:
+                stage_started = time.perf_counter()
+                query_embedding = await self.embedder.generate_embedding(query)
+                timings["embedding_ms"] = _elapsed_ms(stage_started)
+
+            stage_started = time.perf_counter()
+            results = await self._vector_query(
+                query_embedding,
+                n_candidates,
+                n_results,
+                pa_filter,
+                filters,
+                include_embeddings=diversify and settings.MMR_ENABLED,
+            )
+            timings["vector_ms"] = _elapsed_ms(stage_started)
+            return results
+
+        async def lexical_stage() -> Optional[Dict[str, Any]]:
+            if self.lexical is None or not settings.HYBRID_SEARCH_ENABLED:
+                return None
+
+            stage_started = time.perf_counter()
+            try:
+                return await self.lexical.query(query, n_candidates, pa_filter, filters)
+            except Exception:
+                # Vector results alone are still a usable answer
+                logger.exception("Lexical retrieval failed; using vector results only")
+                return None
+            finally:
+                timings["lexical_ms"] = _elapsed_ms(stage_started)
+
+        vector_results, lexical_results = await asyncio.gather(vector_stage(), lexical_stage())
+
+        stage_started = time.perf_counter()
+        hits: Dict[str, Dict[str, Any]] = {}
+        for idx, vector_id in enumerate(vector_results["ids"]):
+            hits[vector_id] = {
+                "id": vector_id,
+                "content": vector_results["documents"][idx],
+                "metadata": vector_results["metadatas"][idx] or {},
+                "similarity": 1 - vector_results["distances"][idx] if vector_results["distances"] else 0,
+                "embedding": vector_results["embeddings"][idx] if vector_results["embeddings"] else None,
+            }
+
+        rankings = [vector_results["ids"]]
+        if lexical_results:
+            for idx, vector_id in enumerate(lexical_results["ids"]):
+                hits.setdefault(vector_id, {
+                    "id": vector_id,
+                    "content": lexical_results["documents"][idx],
+                    "metadata": lexical_results["metadatas"][idx],
+                    "similarity": 0.0,
+                    "embedding": None,
+                })
+            rankings.append(lexical_results["ids"])
+
+        fused = reciprocal_rank_fusion(rankings, k=settings.RRF_K)
+        candidates = [{**hits[vector_id], "score": score} for vector_id, score in fused]
+        timings["fusion_ms"] = _elapsed_ms(stage_started)
+
+        if diversify and settings.MMR_ENABLED and len(candidates) > n_results:
+            candidates = await self._select(query, query_embedding, candidates, n_results, timings)
+        else:
+            candidates = candidates[:n_results]
+
+        for hit in candidates:
+            hit.pop("embedding", None)
+        timings["total_ms"] = _elapsed_ms(started)
+
+        return {
+            "hits": candidates,
+            "timings": timings,
+            "query_embedding": query_embedding,
+        }
+
+    async def _vector_query(
+        self,
+        query_embedding: List[float],
+        n_candidates: int,
+        n_results: int,
+        practice_area_ids: Optional[List[int]],
+        filters: Optional[MetadataFilters],
+        include_embeddings: bool,
+    ) -> Dict[str, Any]:
+        """Vector query with filters pushed down where the store can evaluate them.
+
+        Predicates that must be applied after the query are handled by
+        over-fetching in proportion to the pass rate recently observed for the
+        same filters, so a single query usually fills the page. A second query
+        at the over-fetch cap runs only when the estimate fell short and the
+        store may hold more matches.
+        """
+        where = filters.where_clauses() if filters else None
+        if not (filters and filters.needs_post_filter):
+            return await self.store.query(
+                query_embedding=query_embedding,
+                n_results=n_candidates,
+                practice_area_ids=practice_area_ids,
+                include_embeddings=include_embeddings,
+                where=where,
+            )
+
+        key = repr(filters)
+        max_fetch = n_candidates * settings.SEARCH_MAX_OVERFETCH
+        pass_rate = max(self._pass_rates.get(key, 0.5), 1 / settings.SEARCH_MAX_OVERFETCH)
+        fetch = min(max_fetch, math.ceil(n_candidates / pass_rate))
+
+        while True:
+            results = await self.store.query(
+                query_embedding=query_embedding,
+                n_results=fetch,
+                practice_area_ids=practice_area_ids,
+                include_embeddings=include_embeddings,
+                where=where,
+            )
+            keep = [idx for idx, metadata in enumerate(results["metadatas"]) if filters.matches(metadata or {})]
+            if results["ids"]:
+                observed = len(keep) / len(results["ids"])
+                self._pass_rates.set(key, 0.7 * self._pass_rates.get(key, observed) + 0.3 * observed)
+
+            exhausted = len(results["ids"]) < fetch
+            if len(keep) >= n_results or exhausted or fetch >= max_fetch:
+                break
+            fetch = max_fetch
+
+        keep = keep[:n_candidates]
+        return {
+            name: [values[idx] for idx in keep] if values else values
+            for name, values in results.items()
+        }
+
+    async def _rerank_scores(self, query: str, candidates: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Cross-encoder scores for the candidates, or None if disabled, busy, failing or over budget.
+
+        A scoring thread cannot be interrupted, so a timed-out job keeps its
+        worker until it finishes. While every worker is busy with such jobs,
+        new requests skip reranking instead of queueing behind them.
+        """
+        if self.reranker is None:
+            return None
+        if self._rerank_in_flight >= settings.RERANK_WORKERS:
+            logger.warning("Reranker busy with earlier jobs; using fused ranking")
+            return None
+
+        job = asyncio.get_running_loop().run_in_executor(
+            self._rerank_executor, self.reranker.score, query, [hit["content"] for hit in candidates]
+        )
+        self._rerank_in_flight += 1
+        job.add_done_callback(self._rerank_finished)
+        try:
+            # Shielded so a timeout leaves the job counted until its thread is done
+            scores = await asyncio.wait_for(asyncio.shield(job), timeout=settings.RERANK_BUDGET_MS / 1000)
+        except asyncio.TimeoutError:
+            logger.warning("Reranking exceeded %d ms budget; using fused ranking", settings.RERANK_BUDGET_MS)
+            return None
+        except Exception:
+            logger.exception("Reranking failed; using fused ranking")
+            return None
+        return np.asarray(scores, dtype=np.float32)
+
+    def _rerank_finished(self, job: "asyncio.Future") -> None:
+        self._rerank_in_flight -= 1
+
+    async def _select(
+        self,
+        query: str,
+        query_embedding: List[float],
+        candidates: List[Dict[str, Any]],
+        n_results: int,
+        timings: Dict[str, float],
+    ) -> List[Dict[str, Any]]:
+        """Second stage: rerank (optional) and diversify candidates with MMR."""
+        stage_started = time.perf_counter()
+        missing = [hit["id"] for hit in candidates if hit["embedding"] is None]
+        if missing:
+            stored = await self.store.get_embeddings(missing)
+            for hit in candidates:
+                if hit["embedding"] is None:
+                    hit["embedding"] = stored.get(hit["id"])
+
+        # Candidates without a stored vector cannot be compared; keep the rest
+        candidates = [hit for hit in candidates if hit["embedding"] is not None]
+        if not candidates:
+            return []
+
+        embeddings = normalize_rows(np.asarray([hit["embedding"] for hit in candidates], dtype=np.float32))
+        query_vector = normalize_rows(np.asarray(query_embedding, dtype=np.float32))
+        cosine = embeddings @ query_vector
+        for hit, similarity in zip(candidates, cosine.tolist()):
+            hit["similarity"] = similarity
+        timings["embedding_fetch_ms"] = _elapsed_ms(stage_started)
+
+        stage_started = time.perf_counter()
+        rerank_scores = await self._rerank_scores(query, candidates)
+        if rerank_scores is not None:
+            timings["rerank_ms"] = _elapsed_ms(stage_started)
+            relevance = min_max_scale(rerank_scores)
+        else:
+            relevance = min_max_scale(np.asarray([hit["score"] for hit in candidates], dtype=np.float32))
+
+        stage_started = time.perf_counter()
+        selected = mmr_select(embeddings, relevance, n_results, settings.MMR_LAMBDA)
+        timings["mmr_ms"] = _elapsed_ms(stage_started)
+
+        return [candidates[idx] for idx in selected]
+
+
+# Singleton instance
+hybrid_retriever = HybridRetriever(embedding_service, vector_store, lexical_search_service)
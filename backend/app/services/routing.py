@@ -0,0 +1,70 @@
+"""Latency-aware model routing for chat turns."""
+import re
+from typing import Any, Dict, List, NamedTuple
+
+from app.core.config import settings
+from app.services.context_packer import context_packer
+
+# Cheap cue that a question wants long-form analysis
+ANALYSIS_PATTERN = re.compile(
+    r"\b(analy[sz]e|analysis|compare|comparison|versus|vs\.?|forecast|outlook|strategy|"
+    r"landscape|implications|pros and cons|trade-?offs?|deep dive|in detail|report)\b",
+    re.IGNORECASE,
+)
+
+
+class Route(NamedTuple):
+    """The model and output budget chosen for a turn."""
+    name: str
+    model: str
+    max_tokens: int
+    reason: str
+
+    def to_metadata(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class ModelRouter:
+    """Picks the fast or deep model for a turn from cheap request features.
+
+    An explicit "fast" or "deep" mode always wins. In "auto" mode, short
+    questions with little retrieved context go to the fast model, follow-ups
+    included, unless they ask for analysis; everything else goes to the deep
+    model.
+    """
+
+    def fast(self, reason: str) -> Route:
+        return Route("fast", settings.FAST_MODEL, settings.FAST_MAX_TOKENS, reason)
+
+    def deep(self, reason: str) -> Route:
+        return Route("deep", settings.CLAUDE_MODEL, settings.DEEP_MAX_TOKENS, reason)
+
+    def route(
+        self,
+        query: str,
+        contexts: List[Dict[str, Any]],
+        message_count: int = 0,
+        mode: str = "auto",
+    ) -> Route:
+        """Choose a route for a query given its packed contexts and conversation depth."""
+        if mode == "fast":
+            return self.fast("requested")
+        if mode == "deep" or not settings.ROUTING_ENABLED:
+            return self.deep("requested" if mode == "deep" else "routing disabled")
+
+        if len(query) > settings.ROUTE_FAST_MAX_QUERY_CHARS:
+            return self.deep("long query")
+        if ANALYSIS_PATTERN.search(query):
+            return self.deep("analysis requested")
+
+        # A follow-up over a large retrieved context still needs the deep model's budget
+        context_tokens = sum(context_packer.count_tokens(ctx["content"]) for ctx in contexts)
+        if context_tokens > settings.ROUTE_FAST_MAX_CONTEXT_TOKENS:
+            return self.deep("large context")
+        if message_count > 0:
+            return self.fast("short follow-up")
+        return self.fast("short query, small context")
+
+
+# Singleton instance
+model_router = ModelRouter()
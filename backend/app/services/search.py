@@ -0,0 +1,264 @@
+"""Semantic search with cached ranked candidate lists for paging."""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.services.filters import MetadataFilters
+from app.services.retrieval import HybridRetriever, hybrid_retriever
+from app.utils.cache import TTLCache
+from app.utils.ranking import count_distinct_groups
+
+logger = logging.getLogger(__name__)
+
+# Cached hits keep just enough content for a result preview
+PREVIEW_CHARS = 300
+
+# Client-side slack past the facet statement_timeout, so the server aborts first
+FACET_CLIENT_GRACE_MS = 100
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+class SearchService:
+    """Runs searches and keeps each search's ranked hits for a short TTL.
+
+    Later pages of the same search (same query, user, practice areas, filters
+    and mode) are served from the cached list without re-embedding the query
+    or re-querying the indexes. A cache miss, e.g. after expiry, just
+    recomputes the list.
+    """
+
+    def __init__(self, retriever: Optional[HybridRetriever] = None):
+        self.retriever = retriever or hybrid_retriever
+        self._ranked = TTLCache(
+            max_entries=settings.SEARCH_CURSOR_CACHE_ENTRIES,
+            ttl_seconds=settings.SEARCH_CURSOR_TTL_SECONDS,
+        )
+
+    @staticmethod
+    def search_key(
+        query: str,
+        user_id: UUID,
+        practice_area_ids: List[int],
+        filters: MetadataFilters,
+        grouped: bool,
+    ) -> str:
+        """Stable hash identifying a search; cursors are only valid for the same key."""
+        raw = json.dumps(
+            {
+                "query": " ".join(query.split()),
+                "user": str(user_id),
+                "practice_areas": sorted(practice_area_ids),
+                "filters": filters._asdict(),
+                "grouped": grouped,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    async def ranked_hits(
+        self,
+        query: str,
+        user_id: UUID,
+        practice_area_ids: List[int],
+        filters: MetadataFilters,
+        grouped: bool = False,
+        depth: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Return the search `key`, ranked `hits`, retrieval `timings`, whether they were `cached`
+        and whether the list is `complete`.
+
+        Flat searches rank only `depth` hits (default and cap SEARCH_PAGE_DEPTH)
+        and deepen the cached list when a later page needs more. Deepening
+        keeps the hits already served in place and appends only new ones, so
+        pages never repeat or skip a hit. Grouped searches keep
+        SEARCH_GROUP_MAX_HITS undiversified hits for document grouping.
+        """
+        key = self.search_key(query, user_id, practice_area_ids, filters, grouped)
+        if grouped:
+            target = settings.SEARCH_GROUP_MAX_HITS
+        else:
+            target = min(depth or settings.SEARCH_PAGE_DEPTH, settings.SEARCH_PAGE_DEPTH)
+
+        cached = self._ranked.get(key)
+        if cached is not None:
+            if cached["complete"] or len(cached["hits"]) >= target:
+                return {"key": key, "hits": cached["hits"], "timings": {}, "cached": True, "complete": cached["complete"]}
+            # Grow geometrically, so paging through a search retrieves only a few times
+            target = min(max(target, 2 * len(cached["hits"])), settings.SEARCH_PAGE_DEPTH)
+
+        retrieval = await self.retriever.retrieve(
+            query=query,
+            n_results=target,
+            practice_area_ids=practice_area_ids,
+            filters=filters,
+            diversify=not grouped,
+        )
+        hits = [
+            {**hit, "content": hit["content"][:PREVIEW_CHARS + 1]}
+            for hit in retrieval["hits"]
+        ]
+        complete = grouped or len(hits) < target or target >= settings.SEARCH_PAGE_DEPTH
+        if cached is not None:
+            served = {hit["id"] for hit in cached["hits"]}
+            hits = cached["hits"] + [hit for hit in hits if hit["id"] not in served]
+        self._ranked.set(key, {"hits": hits, "complete": complete})
+        return {"key": key, "hits": hits, "timings": retrieval["timings"], "cached": False, "complete": complete}
+
+    @staticmethod
+    def candidate_facets(hits: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Documents per practice area and per content type among ranked hits."""
+        metadatas = [hit["metadata"] for hit in hits]
+        document_ids = [metadata.get("document_id", "") for metadata in metadatas]
+        area_names = {
+            str(metadata.get("practice_area_id")): metadata.get("practice_area_name", "Unknown")
+            for metadata in metadatas
+        }
+
+        practice_areas = count_distinct_groups(
+            [str(metadata.get("practice_area_id")) for metadata in metadatas], document_ids
+        )
+        content_types = count_distinct_groups(
+            [metadata.get("content_type", "article") for metadata in metadatas], document_ids
+        )
+        return {
+            "practice_areas": [
+                {"value": value, "label": area_names[value], "count": count}
+                for value, count in practice_areas
+            ],
+            "content_types": [
+                {"value": value, "label": value, "count": count}
+                for value, count in content_types
+            ],
+        }
+
+    async def keyword_facets(
+        self,
+        query: str,
+        practice_area_ids: List[int],
+        filters: MetadataFilters,
+    ) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Facets over every document matching the query's keywords, or None past SEARCH_FACET_BUDGET_MS.
+
+        This is a different set from the semantic candidates: documents with
+        at least one chunk matching the query's full-text search, under the
+        same practice areas and filters. Responses label it with
+        scope="keyword_matches".
+
+        The server's statement_timeout enforces the budget. The client waits
+        a little longer, so a slow aggregate is cancelled in Postgres instead
+        of being abandoned mid-query.
+        """
+        if self.retriever.lexical is None:
+            return None
+
+        budget_ms = settings.SEARCH_FACET_BUDGET_MS
+        try:
+            rows = await asyncio.wait_for(
+                self.retriever.lexical.facet_counts(query, practice_area_ids or None, filters, timeout_ms=budget_ms),
+                timeout=(budget_ms + FACET_CLIENT_GRACE_MS) / 1000,
+            )
+        except asyncio.TimeoutError:
+            # Counts are optional; callers fall back to candidate facets
+            return None
+        except DBAPIError as e:
+            if "statement timeout" not in str(e.orig):
+                logger.warning("Keyword facet counts failed", exc_info=True)
+            return None
+        except Exception:
+            logger.warning("Keyword facet counts failed", exc_info=True)
+            return None
+
+        practice_areas: Dict[int, Dict[str, Any]] = {}
+        content_types: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            area = practice_areas.setdefault(
+                row.practice_area_id, {"value": str(row.practice_area_id), "label": row.name, "count": 0}
+            )
+            area["count"] += row.count
+            content_type = row.content_type.value
+            entry = content_types.setdefault(content_type, {"value": content_type, "label": content_type, "count": 0})
+            entry["count"] += row.count
+
+        def ordered(counts: Dict[Any, Dict[str, Any]]) -> List[Dict[str, Any]]:
+            return sorted(counts.values(), key=lambda entry: (-entry["count"], entry["value"]))
+
+        return {"practice_areas": ordered(practice_areas), "content_types": ordered(content_types)}
+
+    async def batch(self, searches: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run several vector searches with one embedding call.
+
+        Each search has `query`, `practice_area_ids`, `filters` and `limit`.
+        Searches sharing the same practice areas and filters go to the index
+        as one multi-query call. Batch searches are vector-only: there is no
+        lexical stage and no MMR. Returns {"hits": [hits per search],
+        "timings": {...}}.
+        """
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        embeddings = await self.retriever.embedder.generate_embeddings([search["query"] for search in searches])
+        timings["embedding_ms"] = _elapsed_ms(started)
+
+        groups: Dict[str, List[int]] = {}
+        for idx, search in enumerate(searches):
+            key = json.dumps(
+                [sorted(search["practice_area_ids"]), search["filters"]._asdict()],
+                sort_keys=True,
+                default=str,
+            )
+            groups.setdefault(key, []).append(idx)
+
+        per_search: List[List[Dict[str, Any]]] = [[] for _ in searches]
+
+        async def run_group(indices: List[int]) -> None:
+            first = searches[indices[0]]
+            filters: MetadataFilters = first["filters"]
+            n_results = max(searches[idx]["limit"] for idx in indices)
+            if filters.needs_post_filter:
+                n_results *= settings.SEARCH_MAX_OVERFETCH
+
+            results = await self.retriever.store.query_many(
+                query_embeddings=[embeddings[idx] for idx in indices],
+                n_results=n_results,
+                practice_area_ids=first["practice_area_ids"] or None,
+                where=filters.where_clauses(),
+            )
+            for idx, result in zip(indices, results):
+                hits = []
+                for vector_id, content, metadata, distance in zip(
+                    result["ids"], result["documents"], result["metadatas"], result["distances"]
+                ):
+                    metadata = metadata or {}
+                    if not filters.matches(metadata):
+                        continue
+                    similarity = 1 - distance
+                    hits.append({
+                        "id": vector_id,
+                        "content": content,
+                        "metadata": metadata,
+                        "similarity": similarity,
+                        "score": similarity,
+                    })
+                    if len(hits) == searches[idx]["limit"]:
+                        break
+                per_search[idx] = hits
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_group(indices) for indices in groups.values()))
+        timings["vector_ms"] = _elapsed_ms(started)
+
+        return {"hits": per_search, "timings": timings}
+
+
+# Singleton instance
+search_service = SearchService()
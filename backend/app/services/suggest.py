@@ -0,0 +1,238 @@
+"""In-memory typeahead over document titles and authors."""
+import asyncio
+import logging
+import re
+import sys
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.document import Document
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _tokens(text: Optional[str]) -> Tuple[str, ...]:
+    """Distinct lowercase words, interned so the index shares one copy of each."""
+    if not text:
+        return ()
+    return tuple(sys.intern(word) for word in dict.fromkeys(TOKEN_PATTERN.findall(text.lower())))
+
+
+class SuggestEntry(NamedTuple):
+    """A document as the typeahead sees it."""
+    document_id: str
+    title: str
+    author: Optional[str]
+    practice_area_id: int
+    title_key: str  # Lowercase title words joined by single spaces
+    title_tokens: Tuple[str, ...]
+    author_tokens: Tuple[str, ...]
+
+
+class SuggestIndex:
+    """Prefix index of title and author words for typeahead suggestions.
+
+    The index is partitioned by practice area, so a user's practice-area
+    filter selects partitions instead of discarding candidates. Each
+    partition keeps two sorted lists: (word, document_id) pairs over title
+    and author words, and (normalized title, document_id) pairs. Anything
+    starting with a prefix is one contiguous run found by binary search.
+
+    A query first collects the titles starting with the whole query straight
+    from the title list, so they are never crowded out, then scans the word
+    run of its longest term and checks the remaining terms. The cap,
+    SUGGEST_MAX_CANDIDATES per query (split across the searched partitions),
+    counts accepted candidates, not scanned entries.
+
+    Ingestion adds and removes documents as they are committed. Each worker
+    process has its own copy, so a periodic rebuild picks up changes made by
+    other workers.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, SuggestEntry] = {}
+        self._words: Dict[int, List[Tuple[str, str]]] = {}
+        self._titles: Dict[int, List[Tuple[str, str]]] = {}
+        # Changes made while a rebuild is reading the database, replayed after it
+        self._journal: Optional[List[Tuple[str, Any]]] = None
+
+    @staticmethod
+    def _entry(document_id: str, title: str, author: Optional[str], practice_area_id: int) -> SuggestEntry:
+        title_key = " ".join(TOKEN_PATTERN.findall(title.lower()))
+        return SuggestEntry(document_id, title, author, practice_area_id, title_key, _tokens(title), _tokens(author))
+
+    @staticmethod
+    def _entry_words(entry: SuggestEntry) -> Iterator[str]:
+        return iter(dict.fromkeys(entry.title_tokens + entry.author_tokens))
+
+    @classmethod
+    def _build(
+        cls,
+        entries: Sequence[SuggestEntry],
+    ) -> Tuple[Dict[int, List[Tuple[str, str]]], Dict[int, List[Tuple[str, str]]]]:
+        words: Dict[int, List[Tuple[str, str]]] = {}
+        titles: Dict[int, List[Tuple[str, str]]] = {}
+        for entry in entries:
+            words.setdefault(entry.practice_area_id, []).extend(
+                (word, entry.document_id) for word in cls._entry_words(entry)
+            )
+            titles.setdefault(entry.practice_area_id, []).append((entry.title_key, entry.document_id))
+        for partition in list(words.values()) + list(titles.values()):
+            partition.sort()
+        return words, titles
+
+    async def load(self) -> None:
+        """Rebuild the index from the documents table."""
+        self._journal = []
+        try:
+            entries = []
+            async with AsyncSessionLocal() as session:
+                result = await session.stream(
+                    select(Document.id, Document.title, Document.author, Document.practice_area_id)
+                    .execution_options(yield_per=5000)
+                )
+                async for row in result:
+                    entries.append(self._entry(str(row.id), row.title, row.author, row.practice_area_id))
+
+            words, titles = await asyncio.to_thread(self._build, entries)
+            self._entries = {entry.document_id: entry for entry in entries}
+            self._words, self._titles = words, titles
+
+            for op, arg in self._journal:
+                if op == "add":
+                    self._add(arg)
+                else:
+                    self._remove(arg)
+        finally:
+            self._journal = None
+
+        logger.info(
+            "Suggest index loaded: %d documents, %d words",
+            len(self._entries),
+            sum(len(partition) for partition in self._words.values()),
+        )
+
+    def add(self, document: Document) -> None:
+        """Index a newly committed document."""
+        entry = self._entry(str(document.id), document.title, document.author, document.practice_area_id)
+        if self._journal is not None:
+            self._journal.append(("add", entry))
+        self._add(entry)
+
+    def remove(self, document_id: str) -> None:
+        """Drop a deleted document from the index."""
+        if self._journal is not None:
+            self._journal.append(("remove", document_id))
+        self._remove(document_id)
+
+    def _add(self, entry: SuggestEntry) -> None:
+        self._remove(entry.document_id)
+        self._entries[entry.document_id] = entry
+        words = self._words.setdefault(entry.practice_area_id, [])
+        for word in self._entry_words(entry):
+            insort(words, (word, entry.document_id))
+        insort(self._titles.setdefault(entry.practice_area_id, []), (entry.title_key, entry.document_id))
+
+    @staticmethod
+    def _discard(partition: List[Tuple[str, str]], pair: Tuple[str, str]) -> None:
+        idx = bisect_left(partition, pair)
+        if idx < len(partition) and partition[idx] == pair:
+            del partition[idx]
+
+    def _remove(self, document_id: str) -> None:
+        entry = self._entries.pop(document_id, None)
+        if entry is None:
+            return
+        words = self._words.get(entry.practice_area_id, [])
+        for word in self._entry_words(entry):
+            self._discard(words, (word, document_id))
+        self._discard(self._titles.get(entry.practice_area_id, []), (entry.title_key, document_id))
+
+    def suggest(
+        self,
+        query: str,
+        practice_area_ids: Optional[Sequence[int]] = None,
+        limit: int = 8,
+    ) -> List[Dict[str, Any]]:
+        """Documents whose title or author has a word starting with every query term.
+
+        Titles starting with the query rank first, then title matches, then
+        author-only matches; shorter titles win ties. An empty
+        `practice_area_ids` means all practice areas.
+        """
+        terms = TOKEN_PATTERN.findall(query.lower())
+        if not terms:
+            return []
+        phrase = " ".join(terms)
+        areas = [pa for pa in (practice_area_ids or list(self._words)) if pa in self._words]
+        if not areas:
+            return []
+        per_area = max(limit, settings.SUGGEST_MAX_CANDIDATES // len(areas))
+
+        # The longest term has the shortest run of candidates
+        probe = max(terms, key=len)
+        others = list(terms)
+        others.remove(probe)
+
+        candidates: Dict[str, Tuple[int, SuggestEntry, bool]] = {}
+        for pa in areas:
+            accepted = 0
+
+            # Titles starting with the whole query, straight from the title run
+            titles = self._titles[pa]
+            idx = bisect_left(titles, (phrase,))
+            while idx < len(titles) and accepted < per_area and titles[idx][0].startswith(phrase):
+                entry = self._entries[titles[idx][1]]
+                candidates[entry.document_id] = (0, entry, True)
+                accepted += 1
+                idx += 1
+
+            # Any title or author words starting with every term
+            words = self._words[pa]
+            idx = bisect_left(words, (probe,))
+            while idx < len(words) and accepted < per_area and words[idx][0].startswith(probe):
+                document_id = words[idx][1]
+                idx += 1
+                if document_id in candidates:
+                    continue
+                entry = self._entries[document_id]
+                entry_words = entry.title_tokens + entry.author_tokens
+                if not all(any(word.startswith(term) for word in entry_words) for term in others):
+                    continue
+
+                in_title = all(any(word.startswith(term) for word in entry.title_tokens) for term in terms)
+                rank = 0 if in_title and entry.title_key.startswith(phrase) else (1 if in_title else 2)
+                candidates[document_id] = (rank, entry, in_title)
+                accepted += 1
+
+        ranked = sorted(candidates.values(), key=lambda item: (item[0], len(item[1].title), item[1].title))
+        return [
+            {
+                "document_id": entry.document_id,
+                "title": entry.title,
+                "author": entry.author,
+                "practice_area_id": entry.practice_area_id,
+                "matched": "title" if in_title else "author",
+            }
+            for _, entry, in_title in ranked[:limit]
+        ]
+
+    async def run_periodically(self) -> None:
+        """Rebuild every SUGGEST_REFRESH_MINUTES (scheduled job)."""
+        interval = settings.SUGGEST_REFRESH_MINUTES * 60
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Suggest index rebuild failed")
+
+
+# Singleton instance
+suggest_index = SuggestIndex()
@@ -1,6 +1,8 @@
 """Vector database service using ChromaDB."""
+import asyncio
 import os
-from typing import List, Optional, Dict, Any
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Dict, Any, Tuple
 from uuid import UUID
 
 import chromadb
@@ -12,19 +14,21 @@ from app.core.config import settings
 class VectorStore:
     """Vector store service using ChromaDB."""
     
-    def __init__(self):
-        # Ensure directory exists
-        os.makedirs(settings.CHROMA_PERSIST_DIRECTORY, exist_ok=True)
-        
-        # Initialize ChromaDB client with persistence
-        self.client = chromadb.PersistentClient(
-            path=settings.CHROMA_PERSIST_DIRECTORY,
-            settings=ChromaSettings(anonymized_telemetry=False),
-        )
+    def __init__(self, client: Optional[Any] = None, collection_name: str = "futurum_documents"):
+        if client is None:
+            # Ensure directory exists
+            os.makedirs(settings.CHROMA_PERSIST_DIRECTORY, exist_ok=True)
+            
+            # Initialize ChromaDB client with persistence
+            client = chromadb.PersistentClient(
+                path=settings.CHROMA_PERSIST_DIRECTORY,
+                settings=ChromaSettings(anonymized_telemetry=False),
+            )
+        self.client = client
         
         # Create or get the main collection
         self.collection = self.client.get_or_create_collection(
-            name="futurum_documents",
+            name=collection_name,
             metadata={"hnsw:space": "cosine"},
         )
     
@@ -48,32 +52,161 @@ class VectorStore:
         query_embedding: List[float],
         n_results: int = 5,
         practice_area_ids: Optional[List[int]] = None,
+        include_embeddings: bool = False,
+        where: Optional[List[Dict[str, Any]]] = None,
     ) -> Dict[str, Any]:
-        """Query the vector store with optional practice area filtering."""
-        where_filter = None
-        if practice_area_ids:
-            where_filter = {"practice_area_id": {"$in": practice_area_ids}}
+        """Query the vector store with optional practice area and metadata filtering.
+        
+        `where` is a list of Chroma metadata clauses, ANDed with each other and
+        with the practice area filter.
+        """
+        where_filter = self._where_filter(practice_area_ids, where)
         
-        results = self.collection.query(
+        include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
+        
+        results = await asyncio.to_thread(
+            self.collection.query,
             query_embeddings=[query_embedding],
             n_results=n_results,
             where=where_filter,
-            include=["documents", "metadatas", "distances"],
+            include=include,
         )
         
+        embeddings = results.get("embeddings") if include_embeddings else None
+        
         return {
             "ids": results["ids"][0] if results["ids"] else [],
             "documents": results["documents"][0] if results["documents"] else [],
             "metadatas": results["metadatas"][0] if results["metadatas"] else [],
             "distances": results["distances"][0] if results["distances"] else [],
+            "embeddings": list(embeddings[0]) if embeddings is not None and len(embeddings) else [],
         }
     
+    @staticmethod
+    def _where_filter(
+        practice_area_ids: Optional[List[int]],
+        where: Optional[List[Dict[str, Any]]],
+    ) -> Optional[Dict[str, Any]]:
+        """Combine the practice area filter and metadata clauses into one Chroma filter."""
+        clauses = list(where or [])
+        if practice_area_ids:
+            clauses.insert(0, {"practice_area_id": {"$in": practice_area_ids}})
+        
+        if not clauses:
+            return None
+        if len(clauses) == 1:
+            return clauses[0]
+        return {"$and": clauses}
+    
+    async def query_many(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        practice_area_ids: Optional[List[int]] = None,
+        where: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run several queries that share one filter in a single index call."""
+        results = await asyncio.to_thread(
+            self.collection.query,
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=self._where_filter(practice_area_ids, where),
+            include=["documents", "metadatas", "distances"],
+        )
+        
+        return [
+            {
+                "ids": results["ids"][idx],
+                "documents": results["documents"][idx],
+                "metadatas": results["metadatas"][idx],
+                "distances": results["distances"][idx],
+            }
+            for idx in range(len(query_embeddings))
+        ]
+    
+    async def get_embeddings(self, ids: List[str]) -> Dict[str, List[float]]:
+        """Fetch stored embeddings by vector ID."""
+        if not ids:
+            return {}
+        
+        results = await asyncio.to_thread(self.collection.get, ids=ids, include=["embeddings"])
+        return dict(zip(results["ids"], results["embeddings"]))
+    
     async def delete_by_document_id(self, document_id: str) -> None:
         """Delete all chunks for a document."""
         self.collection.delete(
             where={"document_id": document_id}
         )
     
+    async def delete_ids(self, ids: List[str]) -> None:
+        """Delete vectors by ID."""
+        if ids:
+            await asyncio.to_thread(self.collection.delete, ids=ids)
+    
+    async def iter_pages(
+        self,
+        page_size: int = 5000,
+    ) -> AsyncIterator[Tuple[List[str], List[Dict[str, Any]]]]:
+        """Yield (ids, metadatas) pages over the whole collection.
+
+        Chroma pages by offset into its insertion order. That order is stable
+        (inserts append, upserts keep their place), but deletes shift later
+        entries forward, so a plain offset would skip vectors. Each read
+        therefore starts one entry early, on the last ID already yielded; if
+        that ID has moved, the scan finds where it went and resumes after it.
+        """
+        offset = 0
+        anchor: Optional[str] = None
+        page_ends: List[str] = []
+        recent: Deque[str] = deque(maxlen=page_size)
+        while True:
+            start = offset - 1 if anchor else offset
+            page = await asyncio.to_thread(
+                self.collection.get,
+                limit=page_size + offset - start,
+                offset=start,
+                include=["metadatas"],
+            )
+            ids = page["ids"]
+            metadatas = page["metadatas"] or [{} for _ in ids]
+            if anchor:
+                if not ids or ids[0] != anchor:
+                    offset, anchor = await self._resume_after(page_ends + list(recent), offset, page_size)
+                    continue
+                ids, metadatas = ids[1:], metadatas[1:]
+            if not ids:
+                break
+            yield ids, metadatas
+            recent.extend(ids)
+            page_ends.append(ids[-1])
+            offset += len(ids)
+            anchor = ids[-1]
+    
+    async def _resume_after(
+        self,
+        seen: List[str],
+        offset: int,
+        page_size: int,
+    ) -> Tuple[int, Optional[str]]:
+        """Offset just past the latest ID in `seen` that still exists, and that ID.
+
+        Deletes only move entries forward, so the search walks back from
+        `offset`. `seen` holds the last `page_size` IDs yielded plus the last ID
+        of every page, so even a short or fully deleted page has a fallback.
+        """
+        known = set(seen)
+        end = offset
+        while end > 0:
+            start = max(end - page_size, 0)
+            page = await asyncio.to_thread(self.collection.get, limit=end - start, offset=start, include=[])
+            for idx in range(len(page["ids"]) - 1, -1, -1):
+                if page["ids"][idx] in known:
+                    return start + idx + 1, page["ids"][idx]
+            end = start
+        return 0, None
+    
     async def get_collection_stats(self) -> Dict[str, Any]:
         """Get collection statistics."""
         return {
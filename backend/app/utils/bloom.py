@@ -0,0 +1,38 @@
+"""Bloom filter for bounded-memory set membership checks."""
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys.
+
+    Membership checks never give false negatives; false positives occur at
+    roughly `error_rate` once `capacity` keys have been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        """Bit positions for a key using double hashing."""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str) -> None:
+        """Add a key to the filter."""
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def update(self, keys: Iterable[str]) -> None:
+        """Add many keys to the filter."""
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
@@ -0,0 +1,55 @@
+"""In-process cache helpers."""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, Optional, Tuple
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return a live entry and mark it most recently used."""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or replace an entry, evicting the least recently used if full."""
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove an entry and return its value."""
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Iterate over live entries without changing recency, dropping expired ones."""
+        now = time.monotonic()
+        expired = []
+        for key, (expires_at, value) in list(self._data.items()):
+            if expires_at < now:
+                expired.append(key)
+            else:
+                yield key, value
+        for key in expired:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,63 @@
+"""Opaque pagination cursors."""
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """Encode a cursor payload as URL-safe base64 JSON."""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def encode_keyset(sort_value: datetime, row_id: uuid.UUID) -> str:
+    """Cursor pointing at a row by its (timestamp, id) sort key."""
+    return encode_cursor({"at": sort_value.isoformat(), "id": str(row_id)})
+
+
+def decode_keyset(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode a cursor from encode_keyset; raises ValueError if it is malformed."""
+    payload = decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(payload["at"]), uuid.UUID(payload["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def seek_newest_first(stmt: Select, sort_column: Any, id_column: Any, cursor: Optional[str], limit: int) -> Select:
+    """Order `stmt` newest first and continue after the row `cursor` points at.
+
+    The row-value comparison lets Postgres seek straight into a
+    (sort_column, id) index, so a deep page costs the same as the first.
+    Fetches `limit` + 1 rows for next_keyset_cursor. Raises ValueError on a
+    malformed cursor.
+    """
+    if cursor:
+        sort_value, row_id = decode_keyset(cursor)
+        stmt = stmt.where(tuple_(sort_column, id_column) < (sort_value, row_id))
+    return stmt.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def next_keyset_cursor(rows: Sequence[Any], limit: int, sort_attr: str) -> Optional[str]:
+    """Cursor for the page after `rows` (fetched by seek_newest_first), or None on the last page."""
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_keyset(getattr(last, sort_attr), last.id)
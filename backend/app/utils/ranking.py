@@ -0,0 +1,135 @@
+"""Ranking and result fusion helpers."""
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+import numpy as np
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]],
+    k: int = 60,
+) -> List[Tuple[Hashable, float]]:
+    """Fuse ranked ID lists with reciprocal rank fusion.
+
+    Each ID scores sum(1 / (k + rank)) over the lists it appears in
+    (rank is 1-based). Returns (id, score) pairs, best first.
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row, leaving zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def min_max_scale(scores: np.ndarray) -> np.ndarray:
+    """Rescale scores to [0, 1]; constant inputs map to 1."""
+    low, high = scores.min(), scores.max()
+    if high - low < 1e-12:
+        return np.ones_like(scores)
+    return (scores - low) / (high - low)
+
+
+def mmr_select(
+    candidate_embeddings: np.ndarray,
+    relevance: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.7,
+) -> List[int]:
+    """Select k candidate indices by maximal marginal relevance.
+
+    `candidate_embeddings` must be row-normalized; redundancy is the highest
+    cosine similarity to any already selected candidate.
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    pairwise = candidate_embeddings @ candidate_embeddings.T
+    max_redundancy = np.full(n, -np.inf)
+    available = np.ones(n, dtype=bool)
+    selected: List[int] = []
+
+    for _ in range(k):
+        redundancy = np.where(np.isfinite(max_redundancy), max_redundancy, 0.0)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        max_redundancy = np.maximum(max_redundancy, pairwise[pick])
+
+    return selected
+
+
+def group_top_hits(
+    group_keys: Sequence[str],
+    scores: np.ndarray,
+    how: str = "max",
+    top_k: int = 3,
+    per_group: int = 3,
+) -> List[Tuple[str, float, int, List[int]]]:
+    """Aggregate hit scores by group without a per-hit Python loop.
+
+    A group scores its best hit ("max") or the sum of its best `top_k` hits
+    ("sum_top_k"). Returns (key, score, hit count, indices of the best
+    `per_group` hits) per group, best group first.
+    """
+    if len(scores) == 0:
+        return []
+
+    keys, codes = np.unique(np.asarray(group_keys, dtype=str), return_inverse=True)
+    # Sort hits by group, then by descending score within the group
+    order = np.lexsort((-scores, codes))
+    sorted_codes = codes[order]
+    sorted_scores = scores[order]
+    starts = np.searchsorted(sorted_codes, np.arange(len(keys)))
+    rank = np.arange(len(order)) - starts[sorted_codes]
+
+    if how == "sum_top_k":
+        in_top = rank < top_k
+        group_scores = np.bincount(sorted_codes[in_top], weights=sorted_scores[in_top], minlength=len(keys))
+    else:
+        group_scores = sorted_scores[starts]
+    counts = np.bincount(codes, minlength=len(keys))
+
+    # Best hits per group are the first `per_group` entries of each group's run
+    best = rank < per_group
+    best_codes, best_hits = sorted_codes[best], order[best]
+    bounds = np.searchsorted(best_codes, np.arange(len(keys) + 1))
+
+    # Stable sort keeps tied groups in key order
+    ranking = np.argsort(-group_scores, kind="stable")
+    return [
+        (
+            str(keys[code]),
+            float(group_scores[code]),
+            int(counts[code]),
+            best_hits[bounds[code]:bounds[code + 1]].tolist(),
+        )
+        for code in ranking.tolist()
+    ]
+
+
+def count_distinct_groups(
+    values: Sequence[str],
+    group_keys: Sequence[str],
+) -> List[Tuple[str, int]]:
+    """Count distinct groups per value, e.g. documents per facet value over chunk hits.
+
+    Each group is counted under the value of its first hit, so values must be
+    constant within a group. Returns (value, count) pairs, largest count first.
+    """
+    if len(values) == 0:
+        return []
+
+    _, first = np.unique(np.asarray(group_keys, dtype=str), return_index=True)
+    uniques, counts = np.unique(np.asarray(values, dtype=str)[first], return_counts=True)
+    order = np.lexsort((uniques, -counts))
+    return [(str(uniques[idx]), int(counts[idx])) for idx in order.tolist()]
@@ -0,0 +1,94 @@
+"""Server-sent event helpers."""
+import asyncio
+import json
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+# Source events buffered ahead of a slow consumer
+QUEUE_SIZE = 256
+
+_END = object()
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one typed server-sent event.
+
+    The payload is JSON, so newlines inside model text cannot break framing.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def coalesce_deltas(
+    events: AsyncGenerator[Dict[str, Any], None],
+    max_delay_ms: float,
+    max_chars: int,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """Merge consecutive `delta` events into larger ones.
+
+    Buffered text is flushed once it reaches `max_chars`, `max_delay_ms` after
+    the first buffered token even if the source goes quiet, or before any
+    other event. The source is drained by its own task into a small queue,
+    so the flush timer never cancels it mid-read. Closing this generator
+    cancels that task and closes `events`.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    async def pump() -> None:
+        try:
+            async for event in events:
+                await queue.put(event)
+            await queue.put(_END)
+        except Exception as exc:
+            await queue.put(exc)
+
+    producer = asyncio.create_task(pump())
+    getter: Optional[asyncio.Future] = None
+    buffer: List[str] = []
+    size = 0
+    flush_at: Optional[float] = None
+
+    try:
+        while True:
+            if getter is None:
+                getter = asyncio.ensure_future(queue.get())
+            timeout = None if flush_at is None else max(0.0, flush_at - time.monotonic())
+            # Waiting on the same getter across timeouts never drops an item
+            done, _ = await asyncio.wait({getter}, timeout=timeout)
+            if not done:
+                yield {"type": "delta", "text": "".join(buffer)}
+                buffer, size, flush_at = [], 0, None
+                continue
+
+            item, getter = getter.result(), None
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            if item["type"] != "delta":
+                if buffer:
+                    yield {"type": "delta", "text": "".join(buffer)}
+                    buffer, size, flush_at = [], 0, None
+                yield item
+                continue
+
+            if not buffer:
+                flush_at = time.monotonic() + max_delay_ms / 1000
+            buffer.append(item["text"])
+            size += len(item["text"])
+
+            if size >= max_chars:
+                yield {"type": "delta", "text": "".join(buffer)}
+                buffer, size, flush_at = [], 0, None
+
+        if buffer:
+            yield {"type": "delta", "text": "".join(buffer)}
+    finally:
+        if getter is not None:
+            getter.cancel()
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+        await events.aclose()
@@ -0,0 +1,6 @@
+"""Shared test setup."""
+import os
+
+# Service singletons build API clients at import time; tests never call them
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
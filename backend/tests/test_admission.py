@@ -0,0 +1,117 @@
+"""Tests for LLM admission control."""
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected, Priority
+
+
+async def _queued(controller, priority):
+    """Start an acquire that has to wait, and let it enqueue."""
+    task = asyncio.create_task(controller.acquire(priority))
+    await asyncio.sleep(0.01)
+    assert not task.done()
+    return task
+
+
+@pytest.mark.asyncio
+async def test_interactive_is_admitted_before_earlier_background():
+    controller = AdmissionController(max_concurrency=1, max_queue=10, max_wait_seconds=60)
+    await controller.acquire(Priority.INTERACTIVE)
+
+    background = await _queued(controller, Priority.BACKGROUND)
+    interactive = await _queued(controller, Priority.INTERACTIVE)
+
+    controller.release()
+    await asyncio.sleep(0.01)
+    assert interactive.done() and not background.done()
+
+    controller.release()
+    await asyncio.wait_for(background, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_reserved_slots_are_not_given_to_background():
+    controller = AdmissionController(max_concurrency=2, max_queue=10, max_wait_seconds=60, interactive_reserved=1)
+    await controller.acquire(Priority.BACKGROUND)
+
+    background = await _queued(controller, Priority.BACKGROUND)
+    # The reserved slot still admits interactive work straight away
+    await asyncio.wait_for(controller.acquire(Priority.INTERACTIVE), timeout=1)
+
+    controller.release()
+    controller.release()
+    await asyncio.wait_for(background, timeout=1)
+    assert controller.metrics()["active"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_shed_with_retry_after():
+    controller = AdmissionController(max_concurrency=1, max_queue=1, max_wait_seconds=60)
+    await controller.acquire()
+    waiting = await _queued(controller, Priority.BACKGROUND)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire()
+
+    assert rejected.value.reason == "LLM queue is full"
+    # One queued ahead at the default 5s hold: (1 + 1) * 5 / 1
+    assert rejected.value.retry_after == pytest.approx(10.0)
+    assert controller.metrics()["rejected_queue_full"] == 1
+    waiting.cancel()
+
+
+@pytest.mark.asyncio
+async def test_predicted_wait_over_limit_is_shed():
+    controller = AdmissionController(max_concurrency=1, max_queue=10, max_wait_seconds=2)
+    await controller.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire()
+
+    assert rejected.value.retry_after == pytest.approx(5.0)
+    assert controller.metrics()["rejected_predicted_wait"] == 1
+    assert controller.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_at_least_one_second():
+    controller = AdmissionController(max_concurrency=100, max_queue=0, max_wait_seconds=60)
+    for _ in range(100):
+        await controller.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire()
+
+    assert rejected.value.retry_after == 1.0
+
+
+@pytest.mark.asyncio
+async def test_waiter_times_out_and_frees_its_place():
+    # Predicted wait is 5s / 100 slots, so the call queues and then times out
+    controller = AdmissionController(max_concurrency=100, max_queue=10, max_wait_seconds=0.1)
+    for _ in range(100):
+        await controller.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire()
+
+    assert rejected.value.reason == "Timed out waiting for an LLM slot"
+    assert controller.queued == 0
+    assert controller.metrics()["rejected_timeout"] == 1
+
+    # The timed-out waiter is skipped rather than handed the slot
+    controller.release()
+    await asyncio.wait_for(controller.acquire(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_slot_releases_on_error():
+    controller = AdmissionController(max_concurrency=1, max_queue=10, max_wait_seconds=60)
+
+    with pytest.raises(RuntimeError):
+        async with controller.slot():
+            raise RuntimeError("provider error")
+
+    assert controller.metrics()["active"] == 0
+    assert controller.metrics()["admitted"] == 1
@@ -0,0 +1,24 @@
+"""Tests for the Bloom filter used by reconciliation."""
+from app.utils.bloom import BloomFilter
+
+
+def test_no_false_negatives():
+    keys = [f"vector-{n}" for n in range(20000)]
+    bloom = BloomFilter(len(keys), error_rate=0.01)
+    bloom.update(keys)
+
+    assert all(key in bloom for key in keys)
+
+
+def test_false_positive_rate_near_target():
+    bloom = BloomFilter(10000, error_rate=0.01)
+    bloom.update(f"present-{n}" for n in range(10000))
+
+    false_positives = sum(f"absent-{n}" in bloom for n in range(10000))
+    assert false_positives / 10000 < 0.03
+
+
+def test_empty_filter_contains_nothing():
+    bloom = BloomFilter(0)
+
+    assert "anything" not in bloom
@@ -0,0 +1,67 @@
+"""Tests for the in-process TTL cache."""
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(max_entries=10, ttl_seconds=30)
+    cache.set("key", "value")
+
+    clock.now += 29
+    assert cache.get("key") == "value"
+
+    clock.now += 2
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_items_skips_and_drops_expired_entries(clock):
+    cache = TTLCache(max_entries=10, ttl_seconds=30)
+    cache.set("old", 1)
+    clock.now += 20
+    cache.set("new", 2)
+    clock.now += 15
+
+    assert list(cache.items()) == [("new", 2)]
+    assert len(cache) == 1
+
+
+def test_set_refreshes_ttl(clock):
+    cache = TTLCache(max_entries=10, ttl_seconds=30)
+    cache.set("key", 1)
+    clock.now += 20
+    cache.set("key", 2)
+    clock.now += 20
+
+    assert cache.get("key") == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(max_entries=2, ttl_seconds=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
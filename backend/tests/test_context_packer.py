@@ -0,0 +1,80 @@
+"""Tests for merging and packing retrieved context."""
+import pytest
+
+from app.services.context_packer import ContextPacker
+
+
+def _ctx(document_id, chunk_index, content, start_char=None, end_char=None, similarity=0.5):
+    return {
+        "document_id": document_id,
+        "chunk_index": chunk_index,
+        "content": content,
+        "start_char": start_char,
+        "end_char": end_char,
+        "similarity": similarity,
+        "title": f"Report {document_id}",
+        "practice_area": "Cloud",
+        "content_type": "article",
+    }
+
+
+@pytest.fixture
+def packer():
+    packer = ContextPacker()
+    try:
+        packer.encoding
+    except Exception as e:
+        pytest.skip(f"cl100k_base encoding unavailable: {e}")
+    return packer
+
+
+def test_merge_joins_adjacent_chunks_using_offsets():
+    merged = ContextPacker().merge([
+        _ctx("a", 1, "world, hello again", start_char=7, end_char=25, similarity=0.9),
+        _ctx("a", 0, "hello, world", start_char=0, end_char=12, similarity=0.4),
+    ])
+
+    assert len(merged) == 1
+    assert merged[0]["content"] == "hello, world, hello again"
+    assert merged[0]["chunk_index"] == 1
+    assert merged[0]["end_char"] == 25
+    assert merged[0]["similarity"] == 0.9
+
+
+def test_merge_falls_back_to_text_overlap_without_offsets():
+    merged = ContextPacker().merge([
+        _ctx("a", 0, "The market grew quickly"),
+        _ctx("a", 1, "grew quickly in 2024"),
+    ])
+
+    assert [span["content"] for span in merged] == ["The market grew quickly in 2024"]
+
+
+def test_merge_keeps_separate_spans_in_relevance_order():
+    merged = ContextPacker().merge([
+        _ctx("b", 5, "second document"),
+        _ctx("a", 0, "first chunk"),
+        _ctx("a", 2, "not adjacent"),
+    ])
+
+    assert [(span["document_id"], span["chunk_index"]) for span in merged] == [("b", 5), ("a", 0), ("a", 2)]
+
+
+def test_pack_stops_at_budget(packer):
+    contexts = [_ctx(str(n), 0, "Revenue grew in every segment. " * 40) for n in range(10)]
+
+    packed = packer.pack(contexts, budget_tokens=1000)
+
+    assert 0 < len(packed) < 10
+    assert not any(span.get("truncated") for span in packed[:-1])
+
+
+def test_pack_truncates_source_containing_special_tokens(packer):
+    content = "Vendor notes <|endoftext|> and more text. " * 300
+
+    packed = packer.pack([_ctx("a", 0, content)], budget_tokens=400)
+
+    assert len(packed) == 1
+    assert packed[0]["truncated"] is True
+    assert content.startswith(packed[0]["content"])
+    assert packer.count_tokens(packed[0]["content"]) < packer.count_tokens(content)
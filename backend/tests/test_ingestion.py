@@ -0,0 +1,52 @@
+"""Tests for streaming chunking in IngestionService."""
+from app.services.ingestion import IngestionService
+
+SENTENCE = "Cloud spending rose {n} percent as enterprises moved analytics workloads. "
+
+
+def _text(sentences: int) -> str:
+    return "".join(SENTENCE.format(n=n) for n in range(sentences))
+
+
+def _pieces(text: str, size: int):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def _service(window: int) -> IngestionService:
+    service = IngestionService()
+    service.stream_window = window
+    return service
+
+
+def test_iter_chunks_positions_match_source_text():
+    text = _text(300)
+    chunks = list(_service(3000).iter_chunks(_pieces(text, 700)))
+
+    assert len(chunks) > 5
+    for chunk, start, end in chunks:
+        assert text[start:end] == chunk
+
+
+def test_iter_chunks_overlap_carries_across_windows():
+    text = _text(300)
+    chunks = list(_service(3000).iter_chunks(_pieces(text, 700)))
+
+    starts = [start for _, start, _ in chunks]
+    assert starts == sorted(starts)
+    assert chunks[0][1] == 0
+    assert chunks[-1][2] == len(text.rstrip())
+    # Every chunk overlaps the previous one, including across window boundaries
+    for (_, _, prev_end), (_, start, _) in zip(chunks, chunks[1:]):
+        assert start < prev_end
+
+
+def test_iter_chunks_matches_whole_text_chunking_for_small_input():
+    text = _text(5)
+    service = _service(8000)
+
+    assert list(service.iter_chunks(_pieces(text, 50))) == service.chunk_text(text)
+
+
+def test_iter_chunks_skips_blank_input():
+    assert list(_service(3000).iter_chunks(["   ", "\n\n"])) == []
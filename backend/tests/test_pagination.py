@@ -0,0 +1,64 @@
+"""Tests for pagination cursors."""
+import base64
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.pagination import (
+    decode_cursor,
+    decode_keyset,
+    encode_cursor,
+    encode_keyset,
+    next_keyset_cursor,
+)
+
+
+def test_cursor_round_trip():
+    payload = {"key": "3f2a9c", "offset": 40}
+
+    cursor = encode_cursor(payload)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == payload
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor!",
+    encode_cursor({"key": "3f2a9c", "offset": 40})[:-3],
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+])
+def test_malformed_or_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_keyset_round_trip():
+    updated_at = datetime(2024, 3, 1, 12, 30, 15, 123456)
+    row_id = uuid.uuid4()
+
+    assert decode_keyset(encode_keyset(updated_at, row_id)) == (updated_at, row_id)
+
+
+@pytest.mark.parametrize("payload", [
+    {"at": "yesterday", "id": str(uuid.uuid4())},
+    {"at": "2024-03-01T12:30:15", "id": "42"},
+    {"at": "2024-03-01T12:30:15"},
+    {"at": None, "id": str(uuid.uuid4())},
+])
+def test_tampered_keyset_is_rejected(payload):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_keyset(encode_cursor(payload))
+
+
+def test_next_keyset_cursor_points_at_last_row_of_page():
+    started = datetime(2024, 3, 1)
+    rows = [SimpleNamespace(id=uuid.uuid4(), updated_at=started - timedelta(minutes=i)) for i in range(4)]
+
+    # limit + 1 rows fetched: there is a next page, continuing after the third row
+    cursor = next_keyset_cursor(rows, limit=3, sort_attr="updated_at")
+    assert decode_keyset(cursor) == (rows[2].updated_at, rows[2].id)
+
+    assert next_keyset_cursor(rows[:3], limit=3, sort_attr="updated_at") is None
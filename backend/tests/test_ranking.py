@@ -0,0 +1,76 @@
+"""Tests for ranking helpers."""
+import numpy as np
+import pytest
+
+from app.utils.ranking import count_distinct_groups, group_top_hits, mmr_select, normalize_rows
+
+
+def test_mmr_pure_relevance_keeps_relevance_order():
+    embeddings = normalize_rows(np.eye(4))
+    relevance = np.array([0.2, 0.9, 0.5, 0.7])
+
+    assert mmr_select(embeddings, relevance, k=4, lambda_mult=1.0) == [1, 3, 2, 0]
+
+
+def test_mmr_skips_near_duplicates():
+    embeddings = normalize_rows(np.array([
+        [1.0, 0.0],
+        [0.99, 0.01],  # Near-duplicate of the first
+        [0.0, 1.0],
+    ]))
+    relevance = np.array([1.0, 0.95, 0.6])
+
+    assert mmr_select(embeddings, relevance, k=2, lambda_mult=0.5) == [0, 2]
+
+
+def test_mmr_caps_k_at_candidate_count():
+    embeddings = normalize_rows(np.eye(2))
+
+    assert sorted(mmr_select(embeddings, np.array([0.1, 0.2]), k=5)) == [0, 1]
+    assert mmr_select(embeddings, np.array([0.1, 0.2]), k=0) == []
+
+
+def test_group_top_hits_max_ranks_groups_by_best_hit():
+    keys = ["a", "b", "a", "c", "b", "a"]
+    scores = np.array([0.5, 0.9, 0.7, 0.1, 0.2, 0.6])
+
+    groups = group_top_hits(keys, scores, how="max", per_group=2)
+
+    assert [(key, count) for key, _, count, _ in groups] == [("b", 2), ("a", 3), ("c", 1)]
+    assert [score for _, score, _, _ in groups] == pytest.approx([0.9, 0.7, 0.1])
+    # Best hits are original indices, highest score first
+    assert [hits for *_, hits in groups] == [[1, 4], [2, 5], [3]]
+
+
+def test_group_top_hits_sum_top_k_rewards_several_strong_hits():
+    keys = ["a", "b", "a", "b", "a"]
+    scores = np.array([0.6, 0.9, 0.6, 0.1, 0.6])
+
+    groups = group_top_hits(keys, scores, how="sum_top_k", top_k=2)
+
+    # "a" sums its best two (1.2); the third hit does not count
+    assert [(key, score) for key, score, _, _ in groups] == [("a", pytest.approx(1.2)), ("b", pytest.approx(1.0))]
+    assert groups[0][2] == 3
+
+
+def test_group_top_hits_ties_keep_key_order_and_empty_input():
+    groups = group_top_hits(["z", "m", "a"], np.array([0.5, 0.5, 0.5]))
+
+    assert [key for key, *_ in groups] == ["a", "m", "z"]
+    assert group_top_hits([], np.array([])) == []
+
+
+def test_count_distinct_groups_counts_each_document_once():
+    # Chunk hits: doc1 has three chunks, doc2 two, doc3 one
+    values = ["contract", "contract", "contract", "tort", "tort", "contract"]
+    doc_ids = ["doc1", "doc1", "doc1", "doc2", "doc2", "doc3"]
+
+    assert count_distinct_groups(values, doc_ids) == [("contract", 2), ("tort", 1)]
+
+
+def test_count_distinct_groups_breaks_ties_by_value():
+    values = ["pdf", "docx", "txt", "docx", "pdf"]
+    doc_ids = ["a", "b", "c", "d", "e"]
+
+    assert count_distinct_groups(values, doc_ids) == [("docx", 2), ("pdf", 2), ("txt", 1)]
+    assert count_distinct_groups([], []) == []
@@ -0,0 +1,84 @@
+"""Tests for the in-memory token-bucket backend."""
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import rate_limit as rate_limit_module
+from app.core.rate_limit import Bucket, InMemoryRateLimitBackend
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.mark.asyncio
+async def test_acquire_takes_cost_until_empty(clock):
+    backend = InMemoryRateLimitBackend()
+    bucket = Bucket("user:1", capacity=5, refill_per_second=1, cost=2)
+
+    assert await backend.acquire([bucket]) == 0
+    assert await backend.acquire([bucket]) == 0
+    # One token left, cost 2: one second until it can pay
+    assert await backend.acquire([bucket]) == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_refill_over_time_is_capped_at_capacity(clock):
+    backend = InMemoryRateLimitBackend()
+    bucket = Bucket("user:1", capacity=2, refill_per_second=0.5)
+
+    assert await backend.acquire([bucket]) == 0
+    assert await backend.acquire([bucket]) == 0
+    assert await backend.acquire([bucket]) == pytest.approx(2.0)
+
+    clock[0] += 2
+    assert await backend.acquire([bucket]) == 0
+    assert await backend.acquire([bucket]) > 0
+
+    clock[0] += 3600
+    assert await backend.acquire([bucket]) == 0
+    assert await backend.acquire([bucket]) == 0
+    assert await backend.acquire([bucket]) > 0
+
+
+@pytest.mark.asyncio
+async def test_acquire_is_all_or_nothing(clock):
+    backend = InMemoryRateLimitBackend()
+    user = Bucket("user:1", capacity=10, refill_per_second=1)
+    company = Bucket("company:acme", capacity=1, refill_per_second=0.1)
+
+    assert await backend.acquire([user, company]) == 0
+    # The company bucket is empty, so the user bucket must not be charged either
+    assert await backend.acquire([user, company]) == pytest.approx(10.0)
+    for _ in range(9):
+        assert await backend.acquire([user]) == 0
+    assert await backend.acquire([user]) > 0
+
+
+@pytest.mark.asyncio
+async def test_charge_can_go_into_debt(clock):
+    backend = InMemoryRateLimitBackend()
+    tokens = Bucket("tokens:user:1", capacity=100, refill_per_second=10, cost=250)
+
+    await backend.charge([tokens])
+
+    # Zero-cost check still waits until the balance is back to zero
+    assert await backend.acquire([tokens._replace(cost=0)]) == pytest.approx(15.0)
+    clock[0] += 15
+    assert await backend.acquire([tokens._replace(cost=0)]) == 0
+
+
+@pytest.mark.asyncio
+async def test_evicted_bucket_comes_back_full(clock):
+    backend = InMemoryRateLimitBackend(max_keys=2)
+    first = Bucket("a", capacity=1, refill_per_second=0.01)
+
+    assert await backend.acquire([first]) == 0
+    assert await backend.acquire([first]) > 0
+    await backend.acquire([Bucket("b", 1, 0.01)])
+    await backend.acquire([Bucket("c", 1, 0.01)])
+
+    assert await backend.acquire([first]) == 0
@@ -0,0 +1,86 @@
+"""Tests for SSE delta coalescing."""
+import asyncio
+import time
+
+import pytest
+
+from app.utils.sse import coalesce_deltas, format_sse
+
+
+async def _source(items, pauses=None):
+    pauses = pauses or {}
+    for idx, item in enumerate(items):
+        if idx in pauses:
+            await asyncio.sleep(pauses[idx])
+        yield item
+
+
+def _deltas(*texts):
+    return [{"type": "delta", "text": text} for text in texts]
+
+
+async def _collect(events, **kwargs):
+    return [event async for event in coalesce_deltas(events, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_buffer_reaches_max_chars():
+    events = await _collect(_source(_deltas("abc", "def", "ghi", "j")), max_delay_ms=10000, max_chars=6)
+
+    assert events == _deltas("abcdef", "ghij")
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_delay_while_source_is_quiet():
+    started = time.monotonic()
+    received = []
+    async for event in coalesce_deltas(
+        _source(_deltas("a", "b", "c"), pauses={2: 0.3}), max_delay_ms=30, max_chars=1000
+    ):
+        received.append((event["text"], time.monotonic() - started))
+
+    assert [text for text, _ in received] == ["ab", "c"]
+    # "ab" goes out on the timer, well before the source resumes
+    assert received[0][1] < 0.2
+
+
+@pytest.mark.asyncio
+async def test_other_events_flush_buffer_and_pass_through_in_order():
+    items = _deltas("a", "b") + [{"type": "usage", "usage": {"output_tokens": 2}}] + _deltas("c")
+
+    events = await _collect(_source(items), max_delay_ms=10000, max_chars=1000)
+
+    assert events == _deltas("ab") + [{"type": "usage", "usage": {"output_tokens": 2}}] + _deltas("c")
+
+
+@pytest.mark.asyncio
+async def test_source_errors_propagate():
+    async def failing():
+        yield {"type": "delta", "text": "a"}
+        raise RuntimeError("provider went away")
+
+    with pytest.raises(RuntimeError, match="provider went away"):
+        await _collect(failing(), max_delay_ms=10000, max_chars=1000)
+
+
+@pytest.mark.asyncio
+async def test_closing_early_closes_the_source():
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                yield {"type": "delta", "text": "x"}
+                await asyncio.sleep(0)
+        finally:
+            closed.set()
+
+    coalesced = coalesce_deltas(endless(), max_delay_ms=10000, max_chars=5)
+    assert (await coalesced.__anext__())["text"] == "xxxxx"
+    await coalesced.aclose()
+
+    assert closed.is_set()
+
+
+def test_format_sse_keeps_newlines_inside_json():
+    assert format_sse("delta", {"text": "a\nb"}) == 'event: delta\ndata: {"text": "a\\nb"}\n\n'
@@ -0,0 +1,62 @@
+"""Tests for the typeahead index."""
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.suggest import SuggestIndex
+
+
+def _document(document_id, title, author=None, practice_area_id=1):
+    return SimpleNamespace(id=document_id, title=title, author=author, practice_area_id=practice_area_id)
+
+
+@pytest.fixture
+def index():
+    index = SuggestIndex()
+    for document in [
+        _document("d1", "Contract Law Essentials", "Jane Smith"),
+        _document("d2", "Law of Contracts", "Alan Brown"),
+        _document("d3", "Employment Disputes", "Contreras Maria"),
+        _document("d4", "Contract Remedies", "Jane Smith", practice_area_id=2),
+        _document("d5", "Tort Liability Handbook", "Peter Jones", practice_area_id=2),
+    ]:
+        index.add(document)
+    return index
+
+
+def _ids(results):
+    return [result["document_id"] for result in results]
+
+
+def test_title_prefix_ranks_before_title_words_and_authors(index):
+    results = index.suggest("contr")
+
+    # Titles starting with the query (shorter first), then title words, then authors
+    assert _ids(results) == ["d4", "d1", "d2", "d3"]
+    assert [result["matched"] for result in results] == ["title", "title", "title", "author"]
+
+
+def test_every_term_must_match(index):
+    assert _ids(index.suggest("law cont")) == ["d2", "d1"]
+    assert _ids(index.suggest("jane rem")) == ["d4"]
+    assert index.suggest("contract tort") == []
+
+
+def test_practice_area_filter(index):
+    assert _ids(index.suggest("contract", practice_area_ids=[2])) == ["d4"]
+    assert index.suggest("contract", practice_area_ids=[99]) == []
+
+
+def test_limit_and_empty_query(index):
+    assert len(index.suggest("contr", limit=2)) == 2
+    assert index.suggest("  --  ") == []
+
+
+def test_remove_and_re_add(index):
+    index.remove("d1")
+    assert "d1" not in _ids(index.suggest("contract"))
+
+    # Re-adding with a new title replaces the old words
+    index.add(_document("d2", "Negligence Primer", "Alan Brown"))
+    assert "d2" not in _ids(index.suggest("law"))
+    assert _ids(index.suggest("negl")) == ["d2"]
@@ -103,6 +103,7 @@ export interface SearchResponse {
   results: SearchResult[]
   query: string
   total_results: number
+  next_cursor?: string | null
 }
 
 // Admin stats